@@ -0,0 +1,123 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+from checkersanalyser import bench, formats, perft, server, tablebase
+from checkersanalyser.batch import run_batch, parse_side
+
+
+def _batch(args):
+    inp = sys.stdin if args.input == "-" else open(args.input)
+    out = sys.stdout if args.output == "-" else open(args.output, "w")
+    try:
+        run_batch(inp, out, args.workers, args.ordered, args.max_pending)
+    finally:
+        if inp is not sys.stdin:
+            inp.close()
+        if out is not sys.stdout:
+            out.close()
+
+
+def _bench(args):
+    report = bench.run_benchmarks(args.depth, args.repeat, args.position, args.benchmark)
+    if args.output == "-":
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    else:
+        bench.save(report, args.output)
+    if args.compare is None:
+        return
+    regressions = bench.compare(report, bench.load(args.compare), args.threshold)
+    for r in regressions:
+        print(f"{r['name']}: {r['metric']} {r['baseline']:.2f} -> {r['current']:.2f} (x{r['ratio']:.2f})",
+              file=sys.stderr)
+    if regressions:
+        sys.exit(1)
+
+
+def _perft(args):
+    board = bench.POSITIONS["opening"][0] if args.board is None else json.loads(args.board)
+    side = parse_side(args.side)
+    if args.fen is not None:
+        board, side = formats.from_fen(args.fen)
+    for r in perft.perft_report(board, side, args.depth, args.generator):
+        print(f"depth {r['depth']}: {r['nodes']} nodes in {r['ms']:.1f} ms ({r['nodes_per_sec'] or 0:.0f} nodes/s)")
+    if args.divide:
+        for move, nodes in perft.perft_divide(board, side, args.depth, args.generator).items():
+            print(f"{move}: {nodes}")
+    if args.check:
+        mismatches = perft.check_generators(board, side, args.depth)
+        for move, (fast, reference) in mismatches.items():
+            print(f"{move}: bitboard {fast}, board {reference}", file=sys.stderr)
+        if mismatches:
+            sys.exit(1)
+
+
+def _serve(args):
+    try:
+        asyncio.run(server.serve(args.host, args.port, args.workers, args.max_queue, args.deadline_ms))
+    except KeyboardInterrupt:
+        pass
+
+
+def _tablebase(args):
+    tablebase.build(args.output, args.pieces)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m checkersanalyser")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    batch = commands.add_parser("batch", help="analyse a JSONL stream of {board, side, depth} "
+                                              "or {fen, depth} records")
+    batch.add_argument("input", nargs="?", default="-", help="input file, - for stdin")
+    batch.add_argument("-o", "--output", default="-", help="output file, - for stdout")
+    batch.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1)
+    batch.add_argument("--ordered", action="store_true", help="write results in input order")
+    batch.add_argument("--max-pending", type=int, default=None,
+                       help="records in flight at once (default: 4 per worker)")
+    batch.set_defaults(func=_batch)
+
+    bn = commands.add_parser("bench", help="time the search, the analyser and move generation on canonical positions")
+    bn.add_argument("-o", "--output", default="-", help="JSON report, - for stdout")
+    bn.add_argument("-d", "--depth", type=int, default=bench.SEARCH_DEPTH)
+    bn.add_argument("-r", "--repeat", type=int, default=3, help="timed runs per benchmark, the fastest counts")
+    bn.add_argument("--position", action="append", choices=list(bench.POSITIONS))
+    bn.add_argument("--benchmark", action="append", choices=list(bench.BENCHMARKS))
+    bn.add_argument("--compare", metavar="BASELINE", help="report of an earlier run; exit 1 on regressions")
+    bn.add_argument("--threshold", type=float, default=0.1, help="allowed growth as a fraction (default 0.1)")
+    bn.set_defaults(func=_bench)
+
+    pf = commands.add_parser("perft", help="count the leaves of the legal move tree")
+    pf.add_argument("-d", "--depth", type=int, default=5)
+    pf.add_argument("--board", help="board as a JSON list of rows (default: the opening)")
+    pf.add_argument("--side", default="whites")
+    pf.add_argument("--fen", help="board and side to move as a FEN string, instead of --board and --side")
+    pf.add_argument("--generator", choices=perft.GENERATORS, default="bitboard")
+    pf.add_argument("--divide", action="store_true", help="split the count by root move")
+    pf.add_argument("--check", action="store_true",
+                    help="compare the bitboard generator with the board one; exit 1 on a mismatch")
+    pf.set_defaults(func=_perft)
+
+    sv = commands.add_parser("serve", help="answer best-move and move-reconstruction requests over HTTP")
+    sv.add_argument("--host", default="127.0.0.1")
+    sv.add_argument("-p", "--port", type=int, default=8080)
+    sv.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1)
+    sv.add_argument("--max-queue", type=int, default=64, help="requests waiting at once before answering 503")
+    sv.add_argument("--deadline-ms", type=float, default=30000, help="default time a request may wait")
+    sv.set_defaults(func=_serve)
+
+    tb = commands.add_parser("tablebase", help="build an endgame tablebase; searches read it from the file "
+                                               "named by CHECKERSANALYSER_TABLEBASE")
+    tb.add_argument("output", help="file to write")
+    tb.add_argument("-n", "--pieces", type=int, default=3, help="largest number of pieces on the board")
+    tb.set_defaults(func=_tablebase)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+import json
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, FIRST_COMPLETED, as_completed, wait
+from typing import Iterable, Optional, TextIO
+
+from checkersanalyser.common import Side
+from checkersanalyser.formats import from_fen
+from checkersanalyser.movemaker import deduce_min_max_result
+from checkersanalyser.search import SEARCH_DEPTH
+
+SIDE_NAMES = {
+    "whites": Side.WHITES, "white": Side.WHITES, "w": Side.WHITES,
+    "blackes": Side.BLACKES, "blacks": Side.BLACKES, "black": Side.BLACKES, "b": Side.BLACKES,
+}
+
+
+def parse_side(name: str) -> Side:
+    try:
+        return SIDE_NAMES[name.lower()]
+    except (KeyError, AttributeError):
+        raise ValueError(f"unknown side: {name!r}")
+
+
+def analyse_line(line_no: int, line: str) -> str:
+    # Parsing and serialising happen here, in the worker, so the reading process only moves strings.
+    res = {"line": line_no}
+    try:
+        record = json.loads(line)
+        if "id" in record:
+            res["id"] = record["id"]
+        if "fen" in record:
+            board, side = from_fen(record["fen"])
+        else:
+            board, side = record["board"], parse_side(record["side"])
+        result = deduce_min_max_result(board, side, int(record.get("depth", SEARCH_DEPTH)),
+                                       record.get("time_budget_ms"), record.get("max_nodes"))
+        res["move"] = None if result.move is None else result.move.to_list()
+        res["score"] = result.score
+        res["depth"] = result.depth
+        res["nodes"] = result.nodes
+    except (ValueError, KeyError, TypeError, IndexError, AttributeError) as e:
+        res["error"] = f"{type(e).__name__}: {e}"
+    return json.dumps(res)
+
+
+def _emit(out: TextIO, text: str):
+    out.write(text + "\n")
+    out.flush()
+
+
+def _records(lines: Iterable[str]):
+    for line_no, line in enumerate(lines, start=1):
+        if line.strip():
+            yield line_no, line
+
+
+def run_batch(lines: Iterable[str], out: TextIO, workers: int = 1, ordered: bool = False,
+              max_pending: Optional[int] = None, executor: Executor = None) -> int:
+    # At most max_pending records are read ahead of the results written out, so memory stays
+    # bounded whatever the length of the input. Returns the number of records processed.
+    count = 0
+    if workers <= 1 and executor is None:
+        for line_no, line in _records(lines):
+            _emit(out, analyse_line(line_no, line))
+            count += 1
+        return count
+    max_pending = max_pending or workers * 4
+    own_executor = executor is None
+    executor = ProcessPoolExecutor(workers) if own_executor else executor
+    try:
+        if ordered:
+            pending = deque()
+            for line_no, line in _records(lines):
+                if len(pending) >= max_pending:
+                    _emit(out, pending.popleft().result())
+                    count += 1
+                pending.append(executor.submit(analyse_line, line_no, line))
+            while pending:
+                _emit(out, pending.popleft().result())
+                count += 1
+        else:
+            pending = set()
+            for line_no, line in _records(lines):
+                if pending:
+                    timeout = None if len(pending) >= max_pending else 0
+                    done, pending = wait(pending, timeout, return_when=FIRST_COMPLETED)
+                    for f in done:
+                        _emit(out, f.result())
+                        count += 1
+                pending.add(executor.submit(analyse_line, line_no, line))
+            for f in as_completed(pending):
+                _emit(out, f.result())
+                count += 1
+    finally:
+        if own_executor:
+            executor.shutdown()
+    return count
@@ -0,0 +1,216 @@
+import json
+import os
+import platform
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+from pyrsistent import freeze
+
+from checkersanalyser.bitboard import from_board, generate_moves, to_board, apply_move
+from checkersanalyser.common import Side
+from checkersanalyser.movecache import default_cache
+from checkersanalyser.moveanalyser import MoveAnalyser
+from checkersanalyser.movemaker import deduce_best_min_max_move, deduce_best_complete_move, deduce_min_max_result
+from checkersanalyser.search import SEARCH_DEPTH
+from checkersanalyser.ttable import default_table
+
+BENCH_VERSION = 2
+GENERATION_ROUNDS = 200
+# Lookups that would answer the repeats from disk instead of searching; they are off while measuring.
+PERSISTENT_TABLES = {"result_cache": "CHECKERSANALYSER_RESULT_CACHE", "tablebase": "CHECKERSANALYSER_TABLEBASE"}
+
+# Boards from the tests plus a few from each phase of the game.
+POSITIONS = {
+    "opening": ([
+        [3, 0, 3, 0, 3, 0, 3, 0],
+        [0, 3, 0, 3, 0, 3, 0, 3],
+        [3, 0, 3, 0, 3, 0, 3, 0],
+        [0, 0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0, 0],
+        [0, 1, 0, 1, 0, 1, 0, 1],
+        [1, 0, 1, 0, 1, 0, 1, 0],
+        [0, 1, 0, 1, 0, 1, 0, 1]
+    ], Side.WHITES),
+    "middlegame": ([
+        [3, 0, 3, 0, 3, 0, 3, 0],
+        [0, 3, 0, 0, 0, 3, 0, 3],
+        [3, 0, 3, 0, 0, 0, 3, 0],
+        [0, 0, 0, 3, 0, 3, 0, 0],
+        [0, 0, 1, 0, 0, 0, 0, 0],
+        [0, 1, 0, 0, 0, 1, 0, 1],
+        [1, 0, 1, 0, 1, 0, 1, 0],
+        [0, 1, 0, 1, 0, 1, 0, 1]
+    ], Side.BLACKES),
+    "capture-chain": ([
+        [0, 0, 0, 0, 0, 0, 0, 0],
+        [0, 3, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 3, 0, 0, 0],
+        [0, 3, 0, 0, 0, 0, 0, 0],
+        [0, 0, 1, 0, 0, 0, 0, 0],
+        [0, 0, 0, 3, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0, 0]
+    ], Side.WHITES),
+    "circular-capture": ([
+        [0, 0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 3, 0, 3, 0, 0],
+        [0, 0, 1, 0, 0, 0, 0, 0],
+        [0, 0, 0, 3, 0, 3, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0, 0],
+        [0, 3, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0, 0]
+    ], Side.WHITES),
+    "endgame": ([
+        [0, 0, 0, 0, 0, 0, 0, 0],
+        [0, 3, 0, 0, 0, 3, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 3, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0, 0],
+        [0, 1, 0, 0, 0, 0, 0, 1],
+        [0, 0, 1, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0, 0]
+    ], Side.WHITES),
+    "kings-endgame": ([
+        [0, 0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 4, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 4, 0, 0],
+        [0, 0, 2, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0, 2]
+    ], Side.WHITES),
+}
+
+
+def _cold():
+    # Every measurement starts from empty shared tables, so runs do not feed each other.
+    default_table().clear()
+    default_cache().clear()
+
+
+@contextmanager
+def _without_persistent_tables():
+    saved = {name: os.environ.pop(var, None) for name, var in PERSISTENT_TABLES.items()}
+    try:
+        yield {name: path is not None for name, path in saved.items()}
+    finally:
+        for name, path in saved.items():
+            if path is not None:
+                os.environ[PERSISTENT_TABLES[name]] = path
+
+
+def _min_max(board, side, depth):
+    deduce_best_min_max_move(board, side, depth)
+
+
+def _complete(board, side, depth):
+    deduce_best_complete_move(board, side, depth)
+
+
+def _analyse(board, side, depth):
+    pos = from_board(board)
+    for m in generate_moves(pos, side):
+        MoveAnalyser(board, to_board(apply_move(pos, side, m))).calculate_move_for_side(side)
+
+
+def _generate(board, side, depth):
+    pos = from_board(board)
+    for _ in range(GENERATION_ROUNDS):
+        generate_moves(pos, side)
+
+
+# The "nodes" of a result count the units of work of one run, so that nodes_per_sec compares runs of
+# the same benchmark: positions searched for min_max, moves reconstructed (one per legal move) for
+# analyse and calls to the generator for generate. complete_move has no count and reports None.
+def _nodes(name: str, board, side, depth) -> Optional[int]:
+    if name == "min_max":
+        _cold()
+        return deduce_min_max_result(board, side, depth).nodes
+    if name == "analyse":
+        return len(generate_moves(from_board(board), side))
+    if name == "generate":
+        return GENERATION_ROUNDS
+    return None
+
+
+BENCHMARKS: dict[str, Callable] = {
+    "min_max": _min_max,
+    "complete_move": _complete,
+    "analyse": _analyse,
+    "generate": _generate,
+}
+
+
+def measure(name: str, board, side: Side, depth: int, repeat: int) -> dict:
+    func = BENCHMARKS[name]
+    board = freeze(board)
+    times = []
+    for _ in range(repeat):
+        _cold()
+        start = time.perf_counter()
+        func(board, side, depth)
+        times.append(time.perf_counter() - start)
+    _cold()
+    tracemalloc.start()
+    try:
+        func(board, side, depth)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    wall = min(times)
+    nodes = _nodes(name, board, side, depth)
+    return {
+        "wall_ms": wall * 1000,
+        "nodes": nodes,
+        "nodes_per_sec": None if nodes is None or wall == 0 else nodes / wall,
+        "peak_kib": peak / 1024,
+    }
+
+
+def run_benchmarks(depth: int = SEARCH_DEPTH, repeat: int = 3, positions: Optional[list[str]] = None,
+                   benchmarks: Optional[list[str]] = None) -> dict:
+    # disabled records which of the persistent tables the environment had turned on.
+    results = {}
+    with _without_persistent_tables() as disabled:
+        for position in positions or POSITIONS:
+            board, side = POSITIONS[position]
+            for name in benchmarks or BENCHMARKS:
+                results[f"{name}/{position}"] = measure(name, board, side, depth, repeat)
+    return {
+        "version": BENCH_VERSION,
+        "python": platform.python_version(),
+        "depth": depth,
+        "repeat": repeat,
+        "disabled": disabled,
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float = 0.1) -> list[dict]:
+    # Wall time and peak memory that grew by more than the threshold, as a fraction of the baseline.
+    if current.get("depth") != baseline.get("depth"):
+        raise ValueError("the baseline was run at another depth")
+    regressions = []
+    for name, res in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            continue
+        for metric in ("wall_ms", "peak_kib"):
+            if base[metric] > 0 and res[metric] > base[metric] * (1 + threshold):
+                regressions.append({"name": name, "metric": metric, "baseline": base[metric],
+                                    "current": res[metric], "ratio": res[metric] / base[metric]})
+    return regressions
+
+
+def load(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def save(report: dict, path: str):
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
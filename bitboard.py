@@ -0,0 +1,247 @@
+from typing import NamedTuple, Optional
+
+from checkersanalyser.common import Side
+from checkersanalyser.geometry import SQUARE_NEIGHBOURS, SQUARE_RAYS, SQUARE_JUMPS, square, coords
+from checkersanalyser.zobrist import PIECE_KEYS, BLACKS_TO_MOVE, hash_bitboards
+
+# Squares are numbered as in geometry: even rows hold the even columns, odd rows the odd ones.
+FULL = 0xFFFFFFFF
+EVEN_ROWS = 0x0F0F0F0F
+ODD_ROWS = 0xF0F0F0F0
+ROW_0 = 0x0000000F
+ROW_7 = 0xF0000000
+FIRST_IN_ROW = 0x11111111
+LAST_IN_ROW = 0x88888888
+
+# Same order as moveanalyser.get_potential_moves, so move lists come out in the same order.
+UP_LEFT, UP_RIGHT, DOWN_LEFT, DOWN_RIGHT = range(4)
+DIRECTIONS = (UP_LEFT, UP_RIGHT, DOWN_LEFT, DOWN_RIGHT)
+FORWARD = {Side.WHITES: (UP_LEFT, UP_RIGHT), Side.BLACKES: (DOWN_LEFT, DOWN_RIGHT)}
+PROMOTION_ROW = {Side.WHITES: ROW_0, Side.BLACKES: ROW_7}
+
+
+def shift(bb: int, d: int) -> int:
+    if d == UP_LEFT:
+        return ((bb & EVEN_ROWS & ~FIRST_IN_ROW & ~ROW_0) >> 5) | ((bb & ODD_ROWS) >> 4)
+    if d == UP_RIGHT:
+        return ((bb & EVEN_ROWS & ~ROW_0) >> 4) | ((bb & ODD_ROWS & ~LAST_IN_ROW) >> 3)
+    if d == DOWN_LEFT:
+        return ((bb & EVEN_ROWS & ~FIRST_IN_ROW) << 3) | ((bb & ODD_ROWS & ~ROW_7) << 4)
+    return ((bb & EVEN_ROWS) << 4) | ((bb & ODD_ROWS & ~LAST_IN_ROW & ~ROW_7) << 5)
+
+
+def squares(bb: int):
+    while bb:
+        low = bb & -bb
+        yield low.bit_length() - 1
+        bb ^= low
+
+
+# Positions are immutable: apply_move returns a new one with the key and the piece counts updated
+# from the move alone, and undoing a move is going back to the parent.
+class Position:
+    __slots__ = ('white_men', 'white_kings', 'black_men', 'black_kings', 'key', 'counts')
+
+    def __init__(self, white_men: int, white_kings: int, black_men: int, black_kings: int, key: int = None,
+                 counts: tuple[int, int, int, int] = None):
+        self.white_men = white_men
+        self.white_kings = white_kings
+        self.black_men = black_men
+        self.black_kings = black_kings
+        self.key = hash_bitboards(self.as_tuple()) if key is None else key
+        self.counts = tuple(bb.bit_count() for bb in self.as_tuple()) if counts is None else counts
+
+    def __eq__(self, other):
+        return isinstance(other, Position) and self.as_tuple() == other.as_tuple()
+
+    def __hash__(self):
+        return self.key
+
+    def __repr__(self):
+        return "Position(0x%08x, 0x%08x, 0x%08x, 0x%08x)" % self.as_tuple()
+
+    def as_tuple(self) -> tuple[int, int, int, int]:
+        return self.white_men, self.white_kings, self.black_men, self.black_kings
+
+    def side_key(self, side: Side) -> int:
+        return self.key ^ BLACKS_TO_MOVE if side == Side.BLACKES else self.key
+
+    def pieces(self, side: Side) -> tuple[int, int]:
+        if side == Side.WHITES:
+            return self.white_men, self.white_kings
+        return self.black_men, self.black_kings
+
+    def occupied(self) -> int:
+        return self.white_men | self.white_kings | self.black_men | self.black_kings
+
+    def material(self, side: Side) -> int:
+        c = self.counts
+        return c[0] + c[1] if side == Side.WHITES else c[2] + c[3]
+
+    def score(self, side: Side) -> int:
+        c = self.counts
+        diff = c[0] + c[1] - c[2] - c[3]
+        return diff if side == Side.WHITES else -diff
+
+    def winning_side(self) -> Optional[Side]:
+        c = self.counts
+        whites = c[0] + c[1]
+        if whites and c[2] + c[3]:
+            return None
+        return Side.WHITES if whites else Side.BLACKES
+
+    def piece_squares(self, side: Side):
+        men, kings = self.pieces(side)
+        for sq in squares(men | kings):
+            yield sq, bool(kings >> sq & 1)
+
+
+def from_board(board) -> Position:
+    # Only the dark squares have bits, so a piece anywhere else could not be represented.
+    bbs = [0, 0, 0, 0]
+    for i, row in enumerate(board):
+        for j, cell in enumerate(row):
+            if cell == 0:
+                continue
+            if cell not in (1, 2, 3, 4):
+                raise ValueError(f"bad piece value {cell!r} at {(i, j)}")
+            if (i + j) % 2 != 0:
+                raise ValueError(f"piece on a light square at {(i, j)}")
+            bbs[cell - 1] |= 1 << square((i, j))
+    return Position(*bbs)
+
+
+def to_board(pos: Position) -> list[list[int]]:
+    board = [[0] * 8 for _ in range(8)]
+    for v, bb in enumerate(pos.as_tuple(), start=1):
+        for sq in squares(bb):
+            i, j = coords(sq)
+            board[i][j] = v
+    return board
+
+
+class BitMove(NamedTuple):
+    path: tuple[int, ...]
+    captured: int
+    promotes: bool
+
+    def to_list(self) -> list[tuple[int, int]]:
+        return [coords(sq) for sq in self.path]
+
+    def __repr__(self):
+        return "{" + " -> ".join(str(coords(sq)) for sq in self.path) + "}"
+
+
+def _has_captures(men: int, kings: int, enemy: int, empty: int) -> bool:
+    for d in DIRECTIONS:
+        if shift(shift(men, d) & enemy, d) & empty:
+            return True
+        ray = shift(kings, d)
+        while ray:
+            if shift(ray & enemy, d) & empty:
+                return True
+            ray = shift(ray & empty, d)
+    return False
+
+
+def _capture_chains(sq: int, is_king: bool, enemy: int, empty: int, promotion_row: int, path: list[int],
+                    captured: int, promotes: bool, res: list[BitMove]):
+    found = False
+    for d in DIRECTIONS:
+        if is_king:
+            for over in SQUARE_RAYS[d][sq]:
+                if not empty >> over & 1:
+                    break
+            else:
+                continue
+            landing = SQUARE_NEIGHBOURS[d][over]
+        else:
+            jump = SQUARE_JUMPS[d][sq]
+            if jump is None:
+                continue
+            over, landing = jump
+        if landing < 0 or not enemy >> over & 1 or not empty >> landing & 1:
+            continue
+        found = True
+        path.append(landing)
+        crowned = not is_king and bool(promotion_row >> landing & 1)
+        captured_bit = 1 << over
+        _capture_chains(landing, is_king or crowned, enemy & ~captured_bit,
+                        (empty | captured_bit | 1 << sq) & ~(1 << landing), promotion_row, path,
+                        captured | captured_bit, promotes or crowned, res)
+        path.pop()
+    if not found and captured:
+        res.append(BitMove(tuple(path), captured, promotes))
+
+
+def generate_moves(pos: Position, side: Side) -> list[BitMove]:
+    men, kings = pos.pieces(side)
+    enemy_men, enemy_kings = pos.pieces(side.opposite_side())
+    enemy = enemy_men | enemy_kings
+    empty = FULL & ~(men | kings | enemy)
+    promotion_row = PROMOTION_ROW[side]
+    res = []
+    if _has_captures(men, kings, enemy, empty):
+        for sq in squares(men | kings):
+            is_king = bool(kings >> sq & 1)
+            _capture_chains(sq, is_king, enemy, empty | 1 << sq, promotion_row, [sq], 0,
+                            not is_king and bool(promotion_row >> sq & 1), res)
+        return res
+    forward = FORWARD[side]
+    for sq in squares(men | kings):
+        if kings >> sq & 1:
+            for d in DIRECTIONS:
+                for to in SQUARE_RAYS[d][sq]:
+                    if not empty >> to & 1:
+                        break
+                    res.append(BitMove((sq, to), 0, False))
+            continue
+        for d in forward:
+            to = SQUARE_NEIGHBOURS[d][sq]
+            if to >= 0 and empty >> to & 1:
+                res.append(BitMove((sq, to), 0, bool(promotion_row >> to & 1 or promotion_row >> sq & 1)))
+    return res
+
+
+def apply_move(pos: Position, side: Side, move: BitMove) -> Position:
+    fr_sq, to_sq = move.path[0], move.path[-1]
+    fr = 1 << fr_sq
+    to = 1 << to_sq
+    keep = FULL & ~move.captured
+    wm, wk, bm, bk = pos.as_tuple()
+    if side == Side.WHITES:
+        mover = 1 if wk & fr else 0
+        if mover:
+            wk = (wk ^ fr) | to
+        elif move.promotes:
+            wm, wk = wm ^ fr, wk | to
+        else:
+            wm = (wm ^ fr) | to
+        enemy_men, enemy_kings = 2, 3
+        captured_kings = bk & move.captured
+        bm, bk = bm & keep, bk & keep
+    else:
+        mover = 3 if bk & fr else 2
+        if mover == 3:
+            bk = (bk ^ fr) | to
+        elif move.promotes:
+            bm, bk = bm ^ fr, bk | to
+        else:
+            bm = (bm ^ fr) | to
+        enemy_men, enemy_kings = 0, 1
+        captured_kings = wk & move.captured
+        wm, wk = wm & keep, wk & keep
+    key = pos.key ^ PIECE_KEYS[mover][fr_sq] ^ PIECE_KEYS[mover | 1 if move.promotes else mover][to_sq]
+    counts = pos.counts
+    if move.promotes:
+        counts = list(counts)
+        counts[mover] -= 1
+        counts[mover | 1] += 1
+    if move.captured:
+        counts = list(counts)
+        kings_taken = captured_kings.bit_count()
+        counts[enemy_kings] -= kings_taken
+        counts[enemy_men] -= move.captured.bit_count() - kings_taken
+        for sq in squares(move.captured):
+            key ^= PIECE_KEYS[enemy_kings if captured_kings >> sq & 1 else enemy_men][sq]
+    return Position(wm, wk, bm, bk, key, tuple(counts))
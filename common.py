@@ -2,11 +2,13 @@ import enum
 
 from pyrsistent import pvector, freeze
 
+from checkersanalyser.geometry import ON_BOARD
+
 VALID_PLACES = [(x, y) for y in range(8) for x in range(8)]
 
 
 def is_out_of_bounds(pos: tuple[int, int]) -> bool:
-    return pos not in VALID_PLACES
+    return pos not in ON_BOARD
 
 
 def is_free_for_occupation(pos: tuple[int, int], board: pvector(pvector([int]))) -> bool:
@@ -81,6 +83,7 @@ def has_friend(board_value: int, side: Side) -> bool:
 
 
 class Piece:
+    __slots__ = ('pos', 'side', 'is_queen')
 
     def __init__(self, i, j, side: Side, is_queen):
         self.pos = (i, j)
@@ -88,6 +91,10 @@ class Piece:
         self.is_queen = is_queen
 
 
+def count_pieces(board, side: Side) -> int:
+    return sum(cell in side.value for row in board for cell in row)
+
+
 def _get_pieces_for_side(board, side: Side) -> list[Piece]:
     pieces = []
     for i in range(len(board)):
@@ -99,6 +106,7 @@ def _get_pieces_for_side(board, side: Side) -> list[Piece]:
 
 
 class Move:
+    __slots__ = ('fr', 'to', 'is_eat_move', 'piece', 'prev_move', 'children', 'board', 'is_final', 'manual_score')
 
     def __init__(self, fr: tuple[int, int], to: tuple[int, int], is_eat_move: bool, piece: Piece):
         self.fr = fr
@@ -145,18 +153,16 @@ class Move:
     def score(self, target_side):
         if self.manual_score is not None:
             return self.manual_score
-        s1 = len(_get_pieces_for_side(self.board, target_side))
-        s2 = len(_get_pieces_for_side(self.board, target_side.opposite_side()))
-        return s1 - s2
+        return count_pieces(self.board, target_side) - count_pieces(self.board, target_side.opposite_side())
 
 
 def get_move_chain(m: Move, chain=None) -> list[Move]:
     if chain is None:
         chain = []
-    chain.append(m)
-    if m.prev_move is None:
-        return chain
-    return get_move_chain(m.prev_move, chain)
+    while m is not None:
+        chain.append(m)
+        m = m.prev_move
+    return chain
 
 
 def get_movement_vector(pos1: tuple[int, int], pos2: tuple[int, int]) -> tuple[int, int]:
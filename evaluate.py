@@ -0,0 +1,89 @@
+from functools import lru_cache
+from typing import NamedTuple, Sequence
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from checkersanalyser.bitboard import Position
+from checkersanalyser.common import Side
+
+PIECES_PER_SIDE = 12
+# Below this many positions the call overhead of numpy costs more than the lookups it replaces.
+NUMPY_MIN_BATCH = 32
+
+
+# Integer weights, from the whites' point of view: a man is worth `man` plus `advancement` for every
+# row it has moved forward, plus `back_rank` while it still guards its own last row.
+class Weights(NamedTuple):
+    man: int = 1
+    king: int = 1
+    advancement: int = 0
+    back_rank: int = 0
+
+
+MATERIAL = Weights()
+
+
+def _cell_weight(piece: int, row: int, w: Weights) -> int:
+    if piece == 0:
+        return w.man + w.advancement * (7 - row) + (w.back_rank if row == 7 else 0)
+    if piece == 2:
+        return -(w.man + w.advancement * row + (w.back_rank if row == 0 else 0))
+    return w.king if piece == 1 else -w.king
+
+
+def max_score(w: Weights) -> int:
+    return PIECES_PER_SIDE * max(abs(_cell_weight(piece, row, w)) for piece in range(4) for row in range(8))
+
+
+# The weight of every piece a byte of a bitboard can hold: _byte_weights(w)[piece][b][v] is the value of
+# the pieces in byte b (rows 2b and 2b + 1) when it reads v. Pieces are ordered as in Position.as_tuple().
+@lru_cache(maxsize=16)
+def _byte_weights(w: Weights) -> tuple[tuple[tuple[int, ...], ...], ...]:
+    return tuple(tuple(tuple(sum(_cell_weight(piece, 2 * b + bit // 4, w) for bit in range(8) if v >> bit & 1)
+                             for v in range(256))
+                       for b in range(4))
+                 for piece in range(4))
+
+
+@lru_cache(maxsize=16)
+def _array_weights(w: Weights):
+    return np.array(_byte_weights(w), dtype=np.int32)
+
+
+def evaluate(pos: Position, side: Side, w: Weights = MATERIAL) -> int:
+    if w == MATERIAL:
+        return pos.score(side)
+    table = _byte_weights(w)
+    score = 0
+    for piece, bb in enumerate(pos.as_tuple()):
+        t = table[piece]
+        score += t[0][bb & 0xFF] + t[1][bb >> 8 & 0xFF] + t[2][bb >> 16 & 0xFF] + t[3][bb >> 24]
+    return score if side == Side.WHITES else -score
+
+
+def evaluate_bitboards(bitboards, side: Side, w: Weights = MATERIAL):
+    # bitboards is an (N, 4) array of the Position.as_tuple() words; returns the N scores.
+    table = _array_weights(w)
+    data = np.ascontiguousarray(bitboards, dtype='<u8').view(np.uint8).reshape(-1, 4, 8)[:, :, :4]
+    scores = table[np.arange(4)[:, None], np.arange(4), data].sum(axis=(1, 2))
+    return scores if side == Side.WHITES else -scores
+
+
+def evaluate_boards(boards, side: Side, w: Weights = MATERIAL):
+    # boards is an (N, 8, 8) array of board values; returns the N scores.
+    values = np.zeros((5, 8), dtype=np.int32)
+    for piece in range(4):
+        values[piece + 1] = [_cell_weight(piece, row, w) for row in range(8)]
+    boards = np.asarray(boards, dtype=np.int8)
+    scores = values[boards, np.arange(8)[:, None]].sum(axis=(1, 2))
+    return scores if side == Side.WHITES else -scores
+
+
+def evaluate_positions(positions: Sequence[Position], side: Side, w: Weights = MATERIAL) -> list[int]:
+    if w == MATERIAL or np is None or len(positions) < NUMPY_MIN_BATCH:
+        return [evaluate(pos, side, w) for pos in positions]
+    bitboards = np.array([pos.as_tuple() for pos in positions], dtype=np.uint64)
+    return evaluate_bitboards(bitboards, side, w).tolist()
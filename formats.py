@@ -0,0 +1,210 @@
+import mmap
+import re
+import struct
+from typing import Iterable, Iterator, Optional, Union
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from checkersanalyser.bitboard import BitMove, Position, from_board, to_board, generate_moves, apply_move, squares
+from checkersanalyser.common import Side
+
+Board = list[list[int]]
+
+# Squares are numbered 1 to 32 as in PDN, row by row from the blacks' back row and, within a row, from
+# the last column to the first, so 1 to 12 hold the blacks at the start. Blacks move first.
+INITIAL_FEN = "B:W21-32:B1-12"
+RESULTS = frozenset(("1-0", "0-1", "1/2-1/2", "2-0", "0-2", "1-1", "*"))
+
+_SIDES = {"W": Side.WHITES, "B": Side.BLACKES}
+_LETTERS = {Side.WHITES: "W", Side.BLACKES: "B"}
+
+
+def _as_position(board: Union[Board, Position]) -> Position:
+    return board if isinstance(board, Position) else from_board(board)
+
+
+def square_number(sq: int) -> int:
+    return (sq ^ 3) + 1
+
+
+def numbered_square(n: int) -> int:
+    return (n - 1) ^ 3
+
+
+def _numbers(bb: int) -> list[int]:
+    return [square_number(sq) for sq in squares(bb)]
+
+
+def to_fen(board: Union[Board, Position], side: Side) -> str:
+    pos = _as_position(board)
+    fields = [_LETTERS[side]]
+    for letter, (men, kings) in (("W", pos.pieces(Side.WHITES)), ("B", pos.pieces(Side.BLACKES))):
+        pieces = sorted([(n, "") for n in _numbers(men)] + [(n, "K") for n in _numbers(kings)])
+        fields.append(letter + ",".join(f"{k}{n}" for n, k in pieces))
+    return ":".join(fields)
+
+
+def _square_numbers(token: str) -> list[int]:
+    first, sep, last = token.partition("-")
+    numbers = list(range(int(first), int(last) + 1)) if sep else [int(first)]
+    if not numbers or any(not 1 <= n <= 32 for n in numbers):
+        raise ValueError(f"bad square in FEN: {token!r}")
+    return numbers
+
+
+def parse_fen_position(fen: str) -> tuple[Position, Side]:
+    fields = fen.strip().rstrip(".").split(":")
+    if fields[0].upper() not in _SIDES:
+        raise ValueError(f"bad side to move in FEN: {fen!r}")
+    bbs = [0, 0, 0, 0]
+    for field in fields[1:]:
+        field = field.strip()
+        if not field or field[0].upper() not in _SIDES:
+            raise ValueError(f"bad piece list in FEN: {fen!r}")
+        base = 0 if field[0].upper() == "W" else 2
+        for token in filter(None, (t.strip() for t in field[1:].split(","))):
+            king = token[0].upper() == "K"
+            for n in _square_numbers(token[1:] if king else token):
+                bit = 1 << numbered_square(n)
+                if (bbs[0] | bbs[1] | bbs[2] | bbs[3]) & bit:
+                    raise ValueError(f"square {n} given twice in FEN: {fen!r}")
+                bbs[base + king] |= bit
+    return Position(*bbs), _SIDES[fields[0].upper()]
+
+
+def from_fen(fen: str) -> tuple[Board, Side]:
+    pos, side = parse_fen_position(fen)
+    return to_board(pos), side
+
+
+def move_text(m: BitMove) -> str:
+    return ("x" if m.captured else "-").join(str(square_number(sq)) for sq in m.path)
+
+
+def parse_move(pos: Position, side: Side, text: str) -> BitMove:
+    # A capture may give every landing square or only the first and the last, when that is unambiguous.
+    path = tuple(numbered_square(int(n)) for n in re.split("[-x:]", text))
+    moves = generate_moves(pos, side)
+    exact = [m for m in moves if m.path == path]
+    if len(exact) == 1:
+        return exact[0]
+    ends = [m for m in moves if len(path) == 2 and (m.path[0], m.path[-1]) == path]
+    if len(ends) == 1:
+        return ends[0]
+    raise ValueError(f"{'ambiguous' if len(exact) + len(ends) > 1 else 'illegal'} move {text!r} for {side}")
+
+
+def to_pdn(board: Union[Board, Position], side: Side, moves: Iterable[BitMove], result: str = "*") -> str:
+    pos = _as_position(board)
+    text = []
+    for ply, m in enumerate(moves, start=0 if side == Side.BLACKES else 1):
+        if ply % 2 == 0:
+            text.append(f"{ply // 2 + 1}.")
+        elif not text:
+            text.append("1...")
+        text.append(move_text(m))
+    text.append(result)
+    return f'[FEN "{to_fen(pos, side)}"]\n\n' + " ".join(text) + "\n"
+
+
+def from_pdn(pdn: str) -> tuple[Board, Side, list[BitMove]]:
+    # The first game of a PDN text: the FEN tag (the opening if there is none) and the moves, checked
+    # against the legal ones. Comments, variations, move numbers and the result are skipped.
+    tag = re.search(r'\[FEN\s+"([^"]*)"\]', pdn)
+    pos, side = parse_fen_position(tag.group(1) if tag else INITIAL_FEN)
+    start_board, start_side = to_board(pos), side
+    body = re.sub(r"\[[^\]]*\]|\{[^}]*\}|\([^)]*\)", " ", pdn)
+    moves = []
+    for token in body.split():
+        if token in RESULTS:
+            break
+        token = re.sub(r"^\d+\.+", "", token).rstrip("!?*")
+        if not token:
+            continue
+        m = parse_move(pos, side, token)
+        moves.append(m)
+        pos = apply_move(pos, side, m)
+        side = side.opposite_side()
+    return start_board, start_side, moves
+
+
+# Packed positions: three bit planes of the dark squares, where bit k of planes 0, 1 and 2 holds a
+# three-bit code for square k (1 white man, 2 white king, 3 black man, 4 black king), followed by a
+# byte for the side to move. Files start with an eight-byte header, then fixed-size records.
+MAGIC = b"CAPS"
+VERSION = 1
+HEADER_BYTES = 8
+_RECORD = struct.Struct("<IIIB")
+RECORD_BYTES = _RECORD.size
+
+
+def _planes(pos: Position) -> tuple[int, int, int]:
+    return pos.white_men | pos.black_men, pos.white_kings | pos.black_men, pos.black_kings
+
+
+def _from_planes(p0: int, p1: int, p2: int) -> Position:
+    return Position(p0 & ~p1, p1 & ~p0, p0 & p1, p2)
+
+
+def pack(board: Union[Board, Position], side: Side) -> bytes:
+    return _RECORD.pack(*_planes(_as_position(board)), side == Side.BLACKES)
+
+
+def unpack(data: bytes) -> tuple[Position, Side]:
+    p0, p1, p2, s = _RECORD.unpack(data)
+    return _from_planes(p0, p1, p2), Side.BLACKES if s else Side.WHITES
+
+
+def write_positions(path: str, records: Iterable[tuple[Union[Board, Position], Side]]) -> int:
+    count = 0
+    with open(path, "wb") as f:
+        f.write(MAGIC + bytes([VERSION, 0, 0, 0]))
+        for board, side in records:
+            f.write(pack(board, side))
+            count += 1
+    return count
+
+
+class PositionFile:
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            header = f.read(HEADER_BYTES)
+            if header[:4] != MAGIC or len(header) < HEADER_BYTES or header[4] != VERSION:
+                raise ValueError(f"{path} is not a position file of version {VERSION}")
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.count = (len(self.data) - HEADER_BYTES) // RECORD_BYTES
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i: int) -> tuple[Position, Side]:
+        if not -self.count <= i < self.count:
+            raise IndexError(i)
+        start = HEADER_BYTES + (i % self.count) * RECORD_BYTES
+        return unpack(self.data[start:start + RECORD_BYTES])
+
+    def __iter__(self) -> Iterator[tuple[Position, Side]]:
+        # Records are decoded straight from the mapping, one at a time.
+        view = memoryview(self.data)[HEADER_BYTES:HEADER_BYTES + self.count * RECORD_BYTES]
+        try:
+            for p0, p1, p2, s in _RECORD.iter_unpack(view):
+                yield _from_planes(p0, p1, p2), Side.BLACKES if s else Side.WHITES
+        finally:
+            view.release()
+
+    def bitboards(self, start: int = 0, stop: Optional[int] = None):
+        # numpy only: the (N, 4) Position.as_tuple() words and the N sides (1 for blacks) of a slice
+        # of the file, for evaluate.evaluate_bitboards.
+        stop = self.count if stop is None else min(stop, self.count)
+        records = np.frombuffer(self.data, dtype=np.dtype([("p", "<u4", 3), ("side", "u1")]),
+                                count=max(0, stop - start), offset=HEADER_BYTES + start * RECORD_BYTES)
+        p0, p1, p2 = (records["p"][:, k].astype(np.uint64) for k in range(3))
+        return np.stack([p0 & ~p1, p1 & ~p0, p0 & p1, p2], axis=1), records["side"].copy()
+
+    def close(self):
+        self.data.close()
@@ -0,0 +1,50 @@
+from typing import Optional
+
+# Built once at import. Directions are in the order moves are generated in: up-left, up-right,
+# down-left, down-right. Tables for the 8x8 list boards are indexed [row][col][direction]; tables
+# for the 32 dark squares of a bitboard are indexed [direction][square].
+DIRECTION_VECTORS = ((-1, -1), (-1, 1), (1, -1), (1, 1))
+ON_BOARD = frozenset((i, j) for i in range(8) for j in range(8))
+
+
+def _step(pos: tuple[int, int], d: int) -> Optional[tuple[int, int]]:
+    nxt = (pos[0] + DIRECTION_VECTORS[d][0], pos[1] + DIRECTION_VECTORS[d][1])
+    return nxt if nxt in ON_BOARD else None
+
+
+def _ray(pos: tuple[int, int], d: int) -> tuple[tuple[int, int], ...]:
+    ray = []
+    nxt = _step(pos, d)
+    while nxt is not None:
+        ray.append(nxt)
+        nxt = _step(nxt, d)
+    return tuple(ray)
+
+
+def _jump(pos: tuple[int, int], d: int) -> Optional[tuple[tuple[int, int], tuple[int, int]]]:
+    over = _step(pos, d)
+    landing = None if over is None else _step(over, d)
+    return None if landing is None else (over, landing)
+
+
+NEIGHBOURS = [[tuple(_step((i, j), d) for d in range(4)) for j in range(8)] for i in range(8)]
+RAYS = [[tuple(_ray((i, j), d) for d in range(4)) for j in range(8)] for i in range(8)]
+JUMPS = [[tuple(_jump((i, j), d) for d in range(4)) for j in range(8)] for i in range(8)]
+
+# Dark squares are numbered row by row: square = 4 * row + col // 2.
+COORDS = tuple((sq >> 2, (sq & 3) * 2 + (sq >> 2 & 1)) for sq in range(32))
+
+
+def square(pos: tuple[int, int]) -> int:
+    return pos[0] * 4 + pos[1] // 2
+
+
+def coords(sq: int) -> tuple[int, int]:
+    return COORDS[sq]
+
+
+SQUARE_NEIGHBOURS = tuple(tuple(-1 if (n := NEIGHBOURS[i][j][d]) is None else square(n) for i, j in COORDS)
+                          for d in range(4))
+SQUARE_RAYS = tuple(tuple(tuple(square(n) for n in RAYS[i][j][d]) for i, j in COORDS) for d in range(4))
+SQUARE_JUMPS = tuple(tuple(None if (jump := JUMPS[i][j][d]) is None else (square(jump[0]), square(jump[1]))
+                           for i, j in COORDS) for d in range(4))
@@ -1,109 +1,208 @@
 import enum
-from copy import deepcopy
-from typing import Optional
+import time
+from typing import Iterable, Iterator, NamedTuple, Optional
 
 from pyrsistent import v, pvector, freeze
 
-from checkersanalyser.common import simplified_board, Side, Piece, get_movement_vector, has_friend, is_out_of_bounds, Move, has_enemy, \
-    add, is_free_for_occupation
+from checkersanalyser import tracing
+from checkersanalyser.bitboard import BitMove, Position, from_board, squares, apply_move
+from checkersanalyser.common import Side, Piece, has_friend, Move, has_enemy
+from checkersanalyser.geometry import NEIGHBOURS, RAYS, coords, square
+from checkersanalyser.movecache import default_cache, to_moves
+from checkersanalyser.tracing import Tracer
 
 
-def logged(func):
-    def logged_func(*args, **kwargs):
-        self = args[0]
-        print(f"INPUT:from: {self._meta['from']}")
-        print(f"INPUT:to: {self._meta['to']}")
-        print(f"INPUT:args: {args[1:]} {kwargs}")
-        res = func(*args, **kwargs)
-        print(f"OUTPUT: {res}")
-        return res
-
-    return logged_func
-
-
-def get_potential_moves(p: Piece, board: pvector(pvector([int]))) -> list[tuple[int, int]]:
-    i = p.pos[0]
-    j = p.pos[1]
-    directions = [(i - 1, j - 1), (i - 1, j + 1), (i + 1, j - 1), (i + 1, j + 1)]
+def get_potential_moves(p: Piece, board: pvector(pvector([int]))) -> list[tuple[tuple[int, int], int]]:
     if not p.is_queen:
-        return directions
+        return [(n, d) for d, n in enumerate(NEIGHBOURS[p.pos[0]][p.pos[1]]) if n is not None]
     queen_moves = []
-    for direction in directions:
-        movement_vector = get_movement_vector(p.pos, direction)
-        move = add(p.pos, movement_vector)
-        while not is_out_of_bounds(move) and board[move[0]][move[1]] == 0:
-            queen_moves.append(move)
-            move = add(move, movement_vector)
-        queen_moves.append(move)
+    for d, ray in enumerate(RAYS[p.pos[0]][p.pos[1]]):
+        for move in ray:
+            queen_moves.append((move, d))
+            if board[move[0]][move[1]] != 0:
+                break
     return queen_moves
 
 
+def create_move(board: pvector(pvector([int])), fr: tuple[int, int], to: tuple[int, int], d: int, p: Piece) -> Optional[
+        Move]:
+    cell = board[to[0]][to[1]]
+    if has_friend(cell, p.side):
+        return None
+    if not has_enemy(cell, p.side):
+        if not p.is_queen and p.side.is_back_move(fr, to):
+            return None
+        return Move(fr, to, False, p)
+    landing = NEIGHBOURS[to[0]][to[1]][d]
+    if landing is None or board[landing[0]][landing[1]] != 0:
+        return None
+    return Move(fr, landing, True, p)
+
+
 class MoveAnalyser:
-    def __init__(self, fromm: list[list[int]], to: list[list[int]]):
+    def __init__(self, fromm: list[list[int]], to: list[list[int]], tracer: Optional[Tracer] = None):
         self._meta = {"from": fromm, "to": to}
         self.fromm = freeze(fromm)
-        self.to = simplified_board(freeze(to))
-
-    def _get_pieces_for_side(self, side: Side) -> list[Piece]:
-        pieces = []
-        for i in range(len(self.fromm)):
-            for j in range(len(self.fromm)):
-                if self.fromm[i][j] in side.value:
-                    is_queen = self.fromm[i][j] == side.value[1]
-                    pieces.append(Piece(i, j, side, is_queen))
-        return pieces
-
-    def _make_move(self, board: pvector(pvector([int])), valid_player_moves: list[Move], move: Move):
+        self.position = from_board(fromm)
+        self.to_position = from_board(to)
+        self.tracer = tracer
+        self.candidates = 0
+
+    def _follow_captures(self, board: list[list[int]], move: Move, eaten: tuple[int, int], removed: int,
+                         target: tuple[int, int], valid_player_moves: list[Move]):
         p = board[move.fr[0]][move.fr[1]]
-        board = board.set(move.fr[0], board[move.fr[0]].set(move.fr[1], 0))  # set initial place to 0
-        board = board.set(move.to[0], board[move.to[0]].set(move.to[1], p))  # set target place
-        if move.is_eat_move:
-            move_vector = get_movement_vector(move.fr, move.to)
-            eaten_piece = tuple(b - a for a, b in zip(move_vector, move.to))
-            board = board.set(eaten_piece[0], board[eaten_piece[0]].set(eaten_piece[1], 0))  # set eaten place to 0
-
-        if simplified_board(board) == self.to:
-            # if board == self.to:
-            valid_player_moves.append(move)
-        if not move.is_eat_move:
-            return
-        new_piece = deepcopy(move.piece)
-        if move.to[0] == move.piece.side.last_enemy_line():
-            new_piece.is_queen = True
-        new_piece.pos = move.to
-        for next_move in filter(lambda m: m.is_eat_move, self._get_moves_for_piece(board, new_piece)):
-            next_move.prev_move = move
-            self._make_move(board, valid_player_moves, next_move)
-
-    @staticmethod
-    def _create_move(board: pvector(pvector([int])), fr: tuple[int, int], to: tuple[int, int], p: Piece) -> Optional[
-        Move]:
-        is_eat_move = False
-        if is_out_of_bounds(to) or has_friend(board[to[0]][to[1]], p.side):
-            return None
-        cell = board[to[0]][to[1]]
-        if not p.is_queen and p.side.is_back_move(fr, to) and not has_enemy(cell, p.side):
-            return None
-        if has_enemy(cell, p.side):
-            move_vector = get_movement_vector(fr, to)
-            to = add(move_vector, to)
-            is_eat_move = True
-        if not is_free_for_occupation(to, board):
-            return None
-        return Move(fr, to, is_eat_move, p)
+        board[move.fr[0]][move.fr[1]] = 0
+        board[move.to[0]][move.to[1]] = p
+        board[eaten[0]][eaten[1]] = 0
+        removed &= ~(1 << square(eaten))
+        if removed == 0:
+            if move.to == target:
+                valid_player_moves.append(move)
+        else:
+            side = move.piece.side
+            new_piece = Piece(move.to[0], move.to[1], side, move.piece.is_queen or move.to[0] == side.last_enemy_line())
+            for next_move, next_eaten in self._get_captures_for_piece(board, new_piece, removed):
+                next_move.prev_move = move
+                self._follow_captures(board, next_move, next_eaten, removed, target, valid_player_moves)
+        board[eaten[0]][eaten[1]] = self.fromm[eaten[0]][eaten[1]]
+        board[move.to[0]][move.to[1]] = 0
+        board[move.fr[0]][move.fr[1]] = p
+
+    def _get_captures_for_piece(self, board: list[list[int]], p: Piece, removed: int) -> list[tuple[Move, tuple[int, int]]]:
+        # Only captures of pieces that are gone from the target board can be part of a matching chain.
+        captures = [(m, pm) for pm, d in get_potential_moves(p, board)
+                    if removed >> square(pm) & 1 and (m := create_move(board, p.pos, pm, d, p)) is not None
+                    and m.is_eat_move]
+        self.candidates += len(captures)
+        return captures
 
     def _get_moves_for_piece(self, board: pvector(pvector([int])), p: Piece) -> list[Move]:
-        return [m for pm in get_potential_moves(p, board) if (m := self._create_move(board, p.pos, pm, p)) is not None]
+        return [m for pm, d in get_potential_moves(p, board) if (m := create_move(board, p.pos, pm, d, p)) is not None]
 
-    @logged
     def calculate_move_for_side(self, side: Side) -> list[Move]:
-        moves: list[Move] = [m for p in self._get_pieces_for_side(side) for m in
-                             self._get_moves_for_piece(self.fromm, p)]
+        t = tracing.tracer if self.tracer is None else self.tracer
+        if t is None:
+            return self._calculate_move_for_side(side)
+        start = time.perf_counter()
+        self.candidates = 0
+        res = self._calculate_move_for_side(side)
+        t({
+            "event": "calculate_move_for_side",
+            "from": self._meta["from"],
+            "to": self._meta["to"],
+            "side": str(side),
+            "candidates": self.candidates,
+            "matched": [m.to_list() for m in res],
+            "elapsed_ms": (time.perf_counter() - start) * 1000,
+        })
+        return res
+
+    def _calculate_move_for_side(self, side: Side) -> list[Move]:
+        # The move is read off the difference between the boards, kings counted as men: the origin is
+        # the only own square vacated, the destination the only one newly occupied, and the captured
+        # pieces are the enemy pieces that disappeared. Anything else cannot be a single move.
+        own_from = self.position.pieces(side)
+        own_to = self.to_position.pieces(side)
+        enemy_from = self.position.pieces(side.opposite_side())
+        enemy_to = self.to_position.pieces(side.opposite_side())
+        own_from, own_to = own_from[0] | own_from[1], own_to[0] | own_to[1]
+        enemy_from, enemy_to = enemy_from[0] | enemy_from[1], enemy_to[0] | enemy_to[1]
+        vacated, arrived = own_from & ~own_to, own_to & ~own_from
+        removed = enemy_from & ~enemy_to
+        if enemy_to & ~enemy_from or vacated.bit_count() > 1 or vacated.bit_count() != arrived.bit_count():
+            return []
+        if removed == 0 and vacated == 0:
+            return []
+        # Usually the frames show a complete legal move, and the legal moves of a position seen before
+        # come from the cache. A frame that ignores the capture rules is reconstructed from the boards.
+        origins_mask = vacated if vacated else own_from
+        from_origins = [m for m in default_cache().moves(self.position, side) if origins_mask >> m.path[0] & 1]
+        self.candidates += len(from_origins)
+        matched = [m for m in from_origins
+                   if m.captured == removed and (arrived >> m.path[-1] & 1 if vacated else m.path[-1] == m.path[0])]
+        if matched:
+            return to_moves(matched, side, self.fromm)
         valid_player_moves: list[Move] = []
-        for move in filter(lambda m: m.is_eat_move, moves):
-            self._make_move(self.fromm, valid_player_moves, move)
-        if len(valid_player_moves) != 0:
-            return valid_player_moves
-        for move in filter(lambda m: not m.is_eat_move, moves):
-            self._make_move(self.fromm, valid_player_moves, move)
+        if removed == 0:
+            origin = coords(vacated.bit_length() - 1)
+            target = coords(arrived.bit_length() - 1)
+            piece = Piece(origin[0], origin[1], side, self.fromm[origin[0]][origin[1]] == side.value[1])
+            moves = self._get_moves_for_piece(self.fromm, piece)
+            self.candidates += len(moves)
+            return [m for m in moves if not m.is_eat_move and m.to == target]
+        if vacated:
+            origins = [coords(vacated.bit_length() - 1)]
+            target = coords(arrived.bit_length() - 1)
+        else:
+            # The piece came back to where it started.
+            origins = [coords(sq) for sq in squares(own_from)]
+            target = None
+        board = [list(row) for row in self.fromm]
+        for origin in origins:
+            piece = Piece(origin[0], origin[1], side, self.fromm[origin[0]][origin[1]] == side.value[1])
+            for move, eaten in self._get_captures_for_piece(board, piece, removed):
+                self._follow_captures(board, move, eaten, removed, origin if target is None else target,
+                                      valid_player_moves)
         return valid_player_moves
+
+
+class Ply(NamedTuple):
+    frame: int
+    side: Optional[Side]
+    moves: tuple[BitMove, ...]
+    position: Position
+
+    @property
+    def legal(self) -> bool:
+        return len(self.moves) != 0
+
+
+def _occupied(pos: Position, side: Side) -> int:
+    men, kings = pos.pieces(side)
+    return men | kings
+
+
+def _moves_to(pos: Position, side: Side, target: Position) -> tuple[BitMove, ...]:
+    # The moves whose position is the target, or failing that, the ones whose position is the target
+    # with kings counted as men, as MoveAnalyser reads frames: a man crowned on the move may still be
+    # shown as a man. The captured pieces and the landing square rule out most moves before any is played.
+    opposite = side.opposite_side()
+    removed = _occupied(pos, opposite) & ~_occupied(target, opposite)
+    own_after = _occupied(target, side)
+    played = [(m, apply_move(pos, side, m)) for m in default_cache().moves(pos, side)
+              if m.captured == removed and own_after >> m.path[-1] & 1]
+    exact = tuple(m for m, p in played if p == target)
+    if exact:
+        return exact
+    return tuple(m for m, p in played
+                 if _occupied(p, side) == own_after and _occupied(p, opposite) == _occupied(target, opposite))
+
+
+def reconstruct_game(boards: Iterable[list[list[int]]], side: Optional[Side] = None) -> Iterator[Ply]:
+    # One Ply for every board after the first: the legal moves of the side to move that lead to it,
+    # usually one. Only the new board is converted, the position before it is carried over from the
+    # previous step. Boards are matched with kings counted as men, like MoveAnalyser does, and the
+    # game goes on from the position the move leads to, with any king the board did not show. The
+    # side alternates after each move; None, at the start or after a board that no legal move
+    # reaches, means it is read off the next board. Unreachable boards come with no moves, and the
+    # game goes on from them.
+    frames = iter(boards)
+    first = next(frames, None)
+    if first is None:
+        return
+    pos = from_board(first)
+    for frame, board in enumerate(frames, start=1):
+        target = from_board(board)
+        moves = ()
+        for mover in (side,) if side is not None else Side:
+            moves = _moves_to(pos, mover, target)
+            if moves:
+                break
+        if moves:
+            target = apply_move(pos, mover, moves[0])
+            yield Ply(frame, mover, moves, target)
+            side = mover.opposite_side()
+        else:
+            yield Ply(frame, side, (), target)
+            side = None
+        pos = target
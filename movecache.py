@@ -0,0 +1,93 @@
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from checkersanalyser.bitboard import BitMove, Position, generate_moves
+from checkersanalyser.common import Side, Move, Piece
+
+DEFAULT_CACHE_ENTRIES = 65536
+
+
+# Maps (position, side to move) to its complete legal moves. The moves are immutable BitMoves, so
+# callers share them freely; anything that needs the mutable Move objects builds them with to_moves.
+class MoveCache:
+
+    def __init__(self, max_entries: int = DEFAULT_CACHE_ENTRIES):
+        if max_entries < 1:
+            raise ValueError("max_entries must be positive")
+        self.max_entries = max_entries
+        self.entries: OrderedDict[tuple[Position, Side], tuple[BitMove, ...]] = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def moves(self, pos: Position, side: Side) -> tuple[BitMove, ...]:
+        key = (pos, side)
+        with self.lock:
+            moves = self.entries.get(key)
+            if moves is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return moves
+            self.misses += 1
+        moves = tuple(generate_moves(pos, side))
+        with self.lock:
+            self.entries[key] = moves
+            if len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return moves
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.hits = self.misses = 0
+
+
+_default_cache: Optional[MoveCache] = None
+
+
+def default_cache() -> MoveCache:
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = MoveCache()
+    return _default_cache
+
+
+def set_default_cache_size(max_entries: int) -> MoveCache:
+    global _default_cache
+    _default_cache = MoveCache(max_entries)
+    return _default_cache
+
+
+def to_moves(moves: list[BitMove], side: Side, board: list[list[int]]) -> list[Move]:
+    # Rebuilds the hop chains the legacy generator returned: chains with a common prefix share its
+    # hops, and the hops leaving one square share their Piece.
+    hops: dict[tuple, Move] = {}
+    pieces: dict[tuple, Piece] = {}
+    res = []
+    for move in moves:
+        path = move.to_list()
+        is_queen = board[path[0][0]][path[0][1]] == side.value[1]
+        prev = None
+        for k in range(1, len(path)):
+            key = tuple(path[:k + 1])
+            m = hops.get(key)
+            if m is None:
+                fr, to = path[k - 1], path[k]
+                piece = pieces.get(key[:-1])
+                if piece is None:
+                    piece = pieces[key[:-1]] = Piece(fr[0], fr[1], side, is_queen)
+                m = hops[key] = Move(fr, to, move.captured != 0, piece)
+                m.prev_move = prev
+                if prev is not None:
+                    if prev.children is None:
+                        prev.children = []
+                    prev.children.append(m)
+            is_queen = is_queen or path[k][0] == side.last_enemy_line()
+            prev = m
+        prev.is_final = True
+        res.append(prev)
+    return res
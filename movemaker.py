@@ -1,35 +1,23 @@
-from copy import deepcopy
-from typing import Optional
+from typing import Iterator, Optional
 
-from pyrsistent import freeze, pvector
+from pyrsistent import pvector
 
-from checkersanalyser.common import Move, Side, get_move_chain, Piece, is_out_of_bounds, has_friend, has_enemy, \
-    get_movement_vector, add, \
-    is_free_for_occupation, flatlist, set_board, _get_pieces_for_side
-from checkersanalyser.moveanalyser import get_potential_moves
+from checkersanalyser.common import Move, Side, get_move_chain, Piece, get_movement_vector, set_board, \
+    _get_pieces_for_side
+from checkersanalyser.bitboard import BitMove, Position, from_board, apply_move
+from checkersanalyser.evaluate import Weights, MATERIAL
+from checkersanalyser.movecache import default_cache, to_moves
+from checkersanalyser.moveanalyser import get_potential_moves, create_move
+from checkersanalyser.parallel import search_parallel
+from checkersanalyser.resultcache import default_result_cache, result_key, to_search_result, from_search_result
+from checkersanalyser.search import Searcher, SearchResult, SEARCH_DEPTH, check_depth
+from checkersanalyser.tablebase import default_tablebase
 
 Board = list[list[int]]
 
-target_side = Side.BLACKES;
-
-def _create_move(board: pvector(pvector([int])), fr: tuple[int, int], to: tuple[int, int], p: Piece) -> Optional[Move]:
-    is_eat_move = False
-    if is_out_of_bounds(to) or has_friend(board[to[0]][to[1]], p.side):
-        return None
-    cell = board[to[0]][to[1]]
-    if not p.is_queen and p.side.is_back_move(fr, to) and not has_enemy(cell, p.side):
-        return None
-    if has_enemy(cell, p.side):
-        move_vector = get_movement_vector(fr, to)
-        to = add(move_vector, to)
-        is_eat_move = True
-    if not is_free_for_occupation(to, board):
-        return None
-    return Move(fr, to, is_eat_move, p)
-
 
 def _get_moves_for_piece(board: Board, p: Piece) -> list[Move]:
-    return [m for pm in get_potential_moves(p, board) if (m := _create_move(board, p.pos, pm, p)) is not None]
+    return [m for pm, d in get_potential_moves(p, board) if (m := create_move(board, p.pos, pm, d, p)) is not None]
 
 
 def execute_move(board: Board, move: list[tuple[int, int]], side: Side) -> Board:
@@ -63,22 +51,19 @@ def complete_move(m: Move, b: Board) -> [Move]:
     m.board = b
     s = m.piece.side
     v = b[m.fr[0]][m.fr[1]]
-    if s.last_enemy_line() == m.to[0]:
+    promoted = s.last_enemy_line() == m.to[0]
+    if promoted:
         v = s.to_queen(v)
-        m.piece.is_queen = True
     b = set_board(b, m.fr, 0)
     b = set_board(b, m.to, v)
-    m.piece.pos = m.to
     if m.is_eat_move:
         move_vector = get_movement_vector(m.fr, m.to)
         eaten_piece = tuple(b1 - a1 for a1, b1 in zip(move_vector, m.to))
         b = b.set(eaten_piece[0], b[eaten_piece[0]].set(eaten_piece[1], 0))  # set eaten place to 0
     if not m.is_eat_move:
         return [m]
-    new_piece = deepcopy(m.piece)
-    if m.to[0] == m.piece.side.last_enemy_line():
-        new_piece.is_queen = True
-    new_piece.pos = m.to
+    # Pieces are values: the moved piece is a new one, the Piece shared by sibling moves is untouched.
+    new_piece = Piece(m.to[0], m.to[1], s, m.piece.is_queen or promoted)
     next_moves = _get_eat_moves_for_piece(new_piece, b)
     if len(next_moves) == 0:
         return [m]
@@ -95,7 +80,8 @@ def _marked_final(m: Move) -> Move:
     return m
 
 
-def _get_complete_player_moves(board: Board, moving_side: Side) -> list[Move]:
+# The board-based generator, kept as the reference the bitboard one is checked against.
+def _generate_complete_player_moves(board: Board, moving_side: Side) -> list[Move]:
     start_moves = [m for p in _get_pieces_for_side(board, moving_side) for m in _get_moves_for_piece(board, p)]
     obl_moves = get_obligatory_moves(start_moves)
     if len(obl_moves) == 0:
@@ -103,102 +89,166 @@ def _get_complete_player_moves(board: Board, moving_side: Side) -> list[Move]:
     return [_marked_final(cm) for m in obl_moves for cm in complete_move(m, board)]
 
 
+def _get_complete_player_moves(board: Board, moving_side: Side) -> list[Move]:
+    return to_moves(default_cache().moves(from_board(board), moving_side), moving_side, board)
+
+
 def _get_winning_side(b: Board) -> Optional[Side]:
-    found_sides = set()
-    for row in b:
-        for cell in row:
-            if cell == 0:
-                continue
-            if cell in Side.WHITES.value:
-                found_sides.add(Side.WHITES)
-            if cell in Side.BLACKES.value:
-                found_sides.add(Side.BLACKES)
-    if Side.WHITES in found_sides and Side.BLACKES in found_sides:
-        return None
-    if Side.WHITES in found_sides:
-        return Side.WHITES
-    else:
-        return Side.BLACKES
+    return from_board(b).winning_side()
 
 
-def simulate_game(board: Board, moving_side: Side, prev_move: Move = None, depth: int = 0) -> list[Move]:
+def _walk_game(board: Board, moving_side: Side, prev_move: Optional[Move], depth: int, max_depth: int,
+               link_children: bool) -> Iterator[Move]:
     if _get_winning_side(board) is not None and prev_move is not None:
         prev_move.board = board
-        return [prev_move]
-    if depth >= 5 and prev_move is not None:
+        yield prev_move
+        return
+    if depth >= max_depth and prev_move is not None:
         prev_move.board = board
-        return [prev_move]
+        yield prev_move
+        return
     moves = _get_complete_player_moves(board, moving_side)
     if len(moves) == 0 and prev_move is not None:
         prev_move.board = board
-        return [prev_move]
-    res = []
-    if prev_move is not None and len(moves) != 0:
+        yield prev_move
+        return
+    if link_children and prev_move is not None and len(moves) != 0:
         prev_move.children = moves
     for m in moves:
         new_board = execute_move(board, m.to_list(), moving_side)
         if prev_move is not None:
             m.prev_move = prev_move
-        [res.append(i) for i in simulate_game(new_board, moving_side.opposite_side(), m, depth + 1)]
-    return res
+        yield from _walk_game(new_board, moving_side.opposite_side(), m, depth + 1, max_depth, link_children)
+
+
+def iter_leaves(board: Board, moving_side: Side, max_depth: int = SEARCH_DEPTH) -> Iterator[Move]:
+    # Depth first and lazy: only the moves along the current path are alive, and each leaf reaches
+    # its line through prev_move. Unlike simulate_game, moves are not linked to their children, so
+    # a leaf the caller drops is freed along with the part of the tree only it was holding.
+    return _walk_game(board, moving_side, None, 0, max_depth, False)
+
+
+def simulate_game(board: Board, moving_side: Side, prev_move: Move = None, depth: int = 0,
+                  max_depth: int = SEARCH_DEPTH) -> list[Move]:
+    return list(_walk_game(board, moving_side, prev_move, depth, max_depth, True))
 
 
 def calculate_board_score(board: pvector(pvector([int])), side: Side) -> int:
-    s1 = len(_get_pieces_for_side(board, side))
-    s2 = len(_get_pieces_for_side(board, side.opposite_side()))
-    return s1 - s2
+    return from_board(board).score(side)
 
 
-def _get_tree_leaves(board: pvector(pvector([int])), side: Side) -> list[tuple[Move, int]]:
-    res = [i for i in simulate_game(board, side)]
-    leaves = [(i, calculate_board_score(i.board, side)) for i in res]
-    return leaves
+def _get_tree_leaves(board: pvector(pvector([int])), side: Side,
+                     max_depth: int = SEARCH_DEPTH) -> Iterator[tuple[Move, int]]:
+    return ((i, calculate_board_score(i.board, side)) for i in iter_leaves(board, side, max_depth))
 
 
-def deduce_best_move(board: list[list[int]], side: Side) -> Move:
-    target_side = side
-    board = freeze(board)
-    leaves = _get_tree_leaves(board, side)
-    m = max(leaves, key=lambda x: x[1])[0]
-    chain = get_move_chain(m)
-    chain.reverse()
-    return chain[0]
+def _to_move(move: BitMove, side: Side, board: Board) -> Move:
+    return to_moves([move], side, board)[0]
 
 
-def deduce_best_complete_move(board: list[list[int]], side: Side) -> Move:
-    target_side = side
-    board = freeze(board)
-    leaves = _get_tree_leaves(board, side)
-    m = max(leaves, key=lambda x: x[1])[0]
+def _first_hop(m: Move) -> Move:
     chain = get_move_chain(m)
-    chain.reverse()
-    m = chain[0]
-    for move in chain:
-        if move.piece.side != side:
-            break
-        m = move
-    return m
+    return chain[-1]
+
+
+def _best_leaf_score(pos: Position, moving_side: Side, target_side: Side, depth: int) -> int:
+    if depth == 0 or pos.winning_side() is not None:
+        return pos.score(target_side)
+    moves = default_cache().moves(pos, moving_side)
+    if len(moves) == 0:
+        return pos.score(target_side)
+    return max(_best_leaf_score(apply_move(pos, moving_side, m), moving_side.opposite_side(), target_side, depth - 1)
+               for m in moves)
+
+
+def _best_root_moves(board: Board, side: Side, score_func, max_depth: int) -> list[BitMove]:
+    # All the moves with the best score, in the order they were generated.
+    pos = from_board(board)
+    best, best_score = [], None
+    for m in default_cache().moves(pos, side):
+        score = score_func(apply_move(pos, side, m), side.opposite_side(), side, max_depth - 1)
+        if best_score is None or score > best_score:
+            best, best_score = [m], score
+        elif score == best_score:
+            best.append(m)
+    return best
+
+
+def _best_root_move(board: Board, side: Side, score_func, max_depth: int) -> Optional[BitMove]:
+    best = _best_root_moves(board, side, score_func, max_depth)
+    return best[0] if best else None
+
+
+def _best_complete_move(board: Board, side: Side, max_depth: int) -> Optional[BitMove]:
+    check_depth(max_depth)
+    cache = default_result_cache()
+    if cache is None:
+        return _best_root_move(board, side, _best_leaf_score, max_depth)
+    pos = from_board(board)
+    key = result_key(pos, side, "complete", max_depth)
+    cached = cache.get(key)
+    res = None if cached is None else to_search_result(cached, pos, side)
+    if res is None:
+        best = _best_root_moves(board, side, _best_leaf_score, max_depth)
+        res = SearchResult(best[0] if best else None, None, max_depth, None)
+        cache.put(key, from_search_result(res, side, tuple(best)))
+    return res.move
+
+
+def deduce_best_move(board: Board, side: Side, max_depth: int = SEARCH_DEPTH) -> Optional[Move]:
+    m = _best_complete_move(board, side, max_depth)
+    return None if m is None else _first_hop(_to_move(m, side, board))
+
+
+def deduce_best_complete_move(board: Board, side: Side, max_depth: int = SEARCH_DEPTH) -> Optional[Move]:
+    m = _best_complete_move(board, side, max_depth)
+    return None if m is None else _to_move(m, side, board)
+
+
+def deduce_min_max_result(board: Board, side: Side, max_depth: int = SEARCH_DEPTH,
+                          time_budget_ms: Optional[float] = None, max_nodes: Optional[int] = None,
+                          workers: Optional[int] = None, weights: Weights = MATERIAL) -> SearchResult:
+    check_depth(max_depth)
+    cache = default_result_cache()
+    if cache is None:
+        return _min_max_result(board, side, max_depth, time_budget_ms, max_nodes, workers, weights)
+    pos = from_board(board)
+    tb = default_tablebase()
+    # Only searches that went the full depth are stored. Those give the same answer whatever budget
+    # allowed them, so a stored answer serves any budget and the budgets are not part of the key.
+    key = result_key(pos, side, "min_max", max_depth, tuple(weights), tb and tb.identity())
+    cached = cache.get(key)
+    res = None if cached is None else to_search_result(cached, pos, side)
+    if res is None:
+        res = _min_max_result(board, side, max_depth, time_budget_ms, max_nodes, workers, weights)
+        if res.depth == max_depth or (time_budget_ms is None and max_nodes is None):
+            cache.put(key, from_search_result(res, side, _tied_moves(pos, side, res, weights)))
+    return res
+
+
+def _tied_moves(pos: Position, side: Side, res: SearchResult, weights: Weights) -> tuple[BitMove, ...]:
+    # Searched without the budgets, which the search that found res has already used up.
+    if res.move is None:
+        return ()
+    searcher = Searcher(res.depth, weights=weights)
+    moves = default_cache().moves(pos, side)
+    return tuple(moves[idx] for idx in searcher.tied_root_moves(pos, side, res.depth, res.score))
 
 
-def _get_root_moves(leaves: list[Move]) -> list[Move]:
-    roots = set()
-    while len(leaves) != 0:
-        l = leaves[-1]
-        if l.prev_move is None:
-            roots.add(leaves.pop())
-        else:
-            leaves[-1] = l.prev_move
-    return list(roots)
+def _min_max_result(board: Board, side: Side, max_depth: int, time_budget_ms: Optional[float],
+                    max_nodes: Optional[int], workers: Optional[int], weights: Weights) -> SearchResult:
+    if workers is not None and workers > 1:
+        if time_budget_ms is not None or max_nodes is not None:
+            raise ValueError("time and node budgets are not supported by the parallel search")
+        return search_parallel(from_board(board), side, max_depth, workers=workers, weights=weights)
+    searcher = Searcher(max_depth, time_budget_ms=time_budget_ms, max_nodes=max_nodes, weights=weights)
+    return searcher.search(from_board(board), side)
 
 
-def deduce_best_min_max_move(board: Board, side: Side) -> Optional[Move]:
-    target_side = side
-    board = freeze(board)
-    leaves = [i for i in simulate_game(board, side)]
-    if len(leaves) == 0:
+def deduce_best_min_max_move(board: Board, side: Side, max_depth: int = SEARCH_DEPTH,
+                             time_budget_ms: Optional[float] = None, max_nodes: Optional[int] = None,
+                             workers: Optional[int] = None, weights: Weights = MATERIAL) -> Optional[Move]:
+    res = deduce_min_max_result(board, side, max_depth, time_budget_ms, max_nodes, workers, weights)
+    if res.move is None:
         return None
-    moves = _get_root_moves(leaves)
-    move = max([(i, i.get_best_score(side)) for i in moves], key=lambda x: x[1])[0]
-    while not move.is_final:
-        move = max([(i, i.get_best_score(side)) for i in move.children], key=lambda x: x[1])[0]
-    return move
+    return _to_move(res.move, side, board)
@@ -0,0 +1,78 @@
+from typing import Optional, Sequence
+
+from checkersanalyser.bitboard import BitMove
+from checkersanalyser.common import Side
+
+KILLERS_PER_PLY = 2
+# History scores stay below the bits that rank the other heuristics.
+HISTORY_LIMIT = 1 << 30
+
+
+def tt_first(n: int, first: Optional[int]) -> list[int]:
+    if first is None or first >= n:
+        return list(range(n))
+    return [first] + [i for i in range(n) if i != first]
+
+
+# The order the search tries the moves of a node in, as indices into the generated moves. The search
+# reports every beta cutoff back so that an ordering can learn from it.
+class MoveOrdering:
+
+    def new_search(self):
+        pass
+
+    def order(self, moves: Sequence[BitMove], side: Side, tt_move: Optional[int], ply: int, depth: int) -> list[int]:
+        return tt_first(len(moves), tt_move)
+
+    def cutoff(self, moves: Sequence[BitMove], side: Side, idx: int, ply: int, depth: int):
+        pass
+
+
+# The table move, then the longest captures, promotions, the quiet moves that last caused a cutoff at
+# the same ply (killers), and the rest by how often and how deep they caused cutoffs (history). Ties
+# keep the generation order. The history outlives the iterations of a search and is halved between
+# searches.
+class HeuristicOrdering(MoveOrdering):
+
+    def __init__(self):
+        self.killers: list[list[BitMove]] = []
+        self.history = ([0] * 1024, [0] * 1024)
+
+    def _age(self):
+        for table in self.history:
+            for i, v in enumerate(table):
+                if v:
+                    table[i] = v >> 1
+
+    def new_search(self):
+        self.killers = []
+        self._age()
+
+    def order(self, moves: Sequence[BitMove], side: Side, tt_move: Optional[int], ply: int, depth: int) -> list[int]:
+        n = len(moves)
+        if depth < 2:
+            # The children are leaves: sorting them costs about as much as searching them.
+            return tt_first(n, tt_move)
+        killers = self.killers[ply] if ply < len(self.killers) else ()
+        history = self.history[side == Side.BLACKES]
+        keys = [m.captured.bit_count() << 32 | m.promotes << 31 | (m in killers) << 30 | history[m.path[0] << 5 | m.path[-1]]
+                for m in moves]
+        if tt_move is not None and tt_move < n:
+            keys[tt_move] = 1 << 40
+        return sorted(range(n), key=keys.__getitem__, reverse=True)
+
+    def cutoff(self, moves: Sequence[BitMove], side: Side, idx: int, ply: int, depth: int):
+        m = moves[idx]
+        if m.captured:
+            return
+        while len(self.killers) <= ply:
+            self.killers.append([])
+        killers = self.killers[ply]
+        if m not in killers:
+            killers.insert(0, m)
+            del killers[KILLERS_PER_PLY:]
+        history = self.history[side == Side.BLACKES]
+        i = m.path[0] << 5 | m.path[-1]
+        history[i] += depth * depth
+        if history[i] >= HISTORY_LIMIT:
+            self._age()
@@ -0,0 +1,96 @@
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Optional
+
+from checkersanalyser.bitboard import Position, generate_moves, apply_move, from_board
+from checkersanalyser.common import Side
+from checkersanalyser.evaluate import Weights, MATERIAL
+from checkersanalyser.search import Searcher, SearchResult, INFINITY, SEARCH_DEPTH
+from checkersanalyser.ttable import TranspositionTable
+
+_pools: dict[int, ProcessPoolExecutor] = {}
+
+
+def _worker_count(workers: Optional[int]) -> int:
+    return workers or os.cpu_count() or 1
+
+
+def get_pool(workers: Optional[int] = None) -> ProcessPoolExecutor:
+    workers = _worker_count(workers)
+    if workers not in _pools:
+        _pools[workers] = ProcessPoolExecutor(workers)
+    return _pools[workers]
+
+
+def shutdown_pools():
+    for pool in _pools.values():
+        pool.shutdown()
+    _pools.clear()
+
+
+def _search_root_move(bitboards: tuple[int, int, int, int], side_name: str, idx: int, depth: int,
+                      alpha: int, weights: Weights = MATERIAL) -> tuple[int, int, int]:
+    # Runs in a worker. Only the four bitboards and the move index cross the process boundary; the
+    # worker regenerates the root moves itself and deepens iteratively inside its subtree so that
+    # its own transposition table orders the moves of the final pass.
+    pos = Position(*bitboards)
+    side = Side[side_name]
+    child = apply_move(pos, side, generate_moves(pos, side)[idx])
+    searcher = Searcher(depth, weights=Weights(*weights))
+    score = alpha
+    for d in range(1, depth):
+        score = -searcher.negamax(child, side.opposite_side(), d, -INFINITY, -alpha)
+    if depth == 1:
+        score = -searcher.static_score(child, side.opposite_side())
+    return idx, score, searcher.nodes
+
+
+def search_parallel(pos: Position, side: Side, max_depth: int = SEARCH_DEPTH,
+                    executor: Executor = None, workers: Optional[int] = None,
+                    weights: Weights = MATERIAL) -> SearchResult:
+    # The first root move is searched with a full window. The others are then searched in parallel
+    # with its score as the lower bound: a move that does not beat it could not have been chosen,
+    # and one that does gets its exact score. The merge therefore picks the same move as
+    # Searcher.search: the highest score, ties going to the move generated first.
+    moves = generate_moves(pos, side)
+    if len(moves) == 0:
+        return SearchResult(None, Searcher(weights=weights).static_score(pos, side), 0, 0)
+    executor = get_pool(workers) if executor is None else executor
+    bitboards = pos.as_tuple()
+    _, best_score, nodes = executor.submit(_search_root_move, bitboards, side.name, 0, max_depth, -INFINITY,
+                                     tuple(weights)).result()
+    best_idx = 0
+    nodes += 1
+    futures = [executor.submit(_search_root_move, bitboards, side.name, idx, max_depth, best_score,
+                               tuple(weights))
+               for idx in range(1, len(moves))]
+    for f in futures:
+        idx, score, n = f.result()
+        nodes += n
+        if score > best_score:
+            best_idx, best_score = idx, score
+    return SearchResult(moves[best_idx], best_score, max_depth, nodes)
+
+
+def measure_speedup(board: list[list[int]], side: Side, max_depth: int = SEARCH_DEPTH,
+                    workers: Optional[int] = None) -> dict:
+    pos = from_board(board)
+    executor = get_pool(workers)
+    search_parallel(pos, side, 1, executor)  # start the workers before timing
+    searcher = Searcher(max_depth, TranspositionTable())
+    start = time.perf_counter()
+    serial = searcher.search(pos, side)
+    serial_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    parallel = search_parallel(pos, side, max_depth, executor)
+    parallel_ms = (time.perf_counter() - start) * 1000
+    return {
+        "workers": _worker_count(workers),
+        "serial_ms": serial_ms,
+        "parallel_ms": parallel_ms,
+        "speedup": serial_ms / parallel_ms if parallel_ms else None,
+        "serial_nodes": serial.nodes,
+        "parallel_nodes": parallel.nodes,
+        "matches": serial.move == parallel.move and serial.score == parallel.score,
+    }
@@ -0,0 +1,78 @@
+import time
+
+from pyrsistent import freeze
+
+from checkersanalyser.bitboard import Position, from_board, generate_moves, apply_move
+from checkersanalyser.common import Side
+from checkersanalyser.movemaker import _generate_complete_player_moves, execute_move
+
+Board = list[list[int]]
+
+
+# Leaf counts of the legal move tree, where a move is a complete capture chain. A side left without
+# moves ends its line, which then adds nothing to the deeper counts.
+def _perft_bitboard(pos: Position, side: Side, depth: int) -> int:
+    moves = generate_moves(pos, side)
+    if depth == 1:
+        return len(moves)
+    opposite = side.opposite_side()
+    return sum(_perft_bitboard(apply_move(pos, side, m), opposite, depth - 1) for m in moves)
+
+
+def _perft_board(board, side: Side, depth: int) -> int:
+    moves = _generate_complete_player_moves(board, side)
+    if depth == 1:
+        return len(moves)
+    opposite = side.opposite_side()
+    return sum(_perft_board(execute_move(board, m.to_list(), side), opposite, depth - 1) for m in moves)
+
+
+GENERATORS = ("bitboard", "board")
+
+
+def _check_generator(generator: str):
+    if generator not in GENERATORS:
+        raise ValueError(f"unknown generator: {generator!r}")
+
+
+def perft(board: Board, side: Side, depth: int, generator: str = "bitboard") -> int:
+    _check_generator(generator)
+    if depth == 0:
+        return 1
+    if generator == "bitboard":
+        return _perft_bitboard(from_board(board), side, depth)
+    return _perft_board(freeze(board), side, depth)
+
+
+def perft_divide(board: Board, side: Side, depth: int, generator: str = "bitboard") -> dict[str, int]:
+    # The leaves under each root move, keyed by the move as it prints.
+    _check_generator(generator)
+    if depth < 1:
+        raise ValueError("depth must be at least 1")
+    opposite = side.opposite_side()
+    if generator == "bitboard":
+        pos = from_board(board)
+        return {repr(m): 1 if depth == 1 else _perft_bitboard(apply_move(pos, side, m), opposite, depth - 1)
+                for m in generate_moves(pos, side)}
+    board = freeze(board)
+    return {repr(m): 1 if depth == 1 else _perft_board(execute_move(board, m.to_list(), side), opposite, depth - 1)
+            for m in _generate_complete_player_moves(board, side)}
+
+
+def perft_report(board: Board, side: Side, depth: int, generator: str = "bitboard") -> list[dict]:
+    report = []
+    for d in range(1, depth + 1):
+        start = time.perf_counter()
+        nodes = perft(board, side, d, generator)
+        elapsed = time.perf_counter() - start
+        report.append({"depth": d, "nodes": nodes, "ms": elapsed * 1000,
+                       "nodes_per_sec": nodes / elapsed if elapsed else None})
+    return report
+
+
+def check_generators(board: Board, side: Side, depth: int) -> dict[str, tuple[int, int]]:
+    # The root moves whose leaf counts differ between the bitboard and the board generator.
+    fast = perft_divide(board, side, depth, "bitboard")
+    reference = perft_divide(board, side, depth, "board")
+    return {name: (fast.get(name, 0), reference.get(name, 0))
+            for name in sorted(fast.keys() | reference.keys()) if fast.get(name, 0) != reference.get(name, 0)}
@@ -0,0 +1,84 @@
+import threading
+from typing import Optional
+
+from pyrsistent import freeze
+
+from checkersanalyser.bitboard import Position, from_board, apply_move
+from checkersanalyser.common import Move, Side
+from checkersanalyser.evaluate import Weights, MATERIAL
+from checkersanalyser.movecache import to_moves
+from checkersanalyser.search import Searcher, SearchResult, SEARCH_DEPTH
+from checkersanalyser.ttable import TranspositionTable
+
+
+# Searches for one player of a live game. After each answer it goes on searching, on a background
+# thread, the position expected after the opponent's reply from the principal variation. When that
+# position comes, the answer is taken from the background search: at once if it has finished, or after
+# waiting for it, up to the time budget, and then the deepest result it completed. Any other position
+# stops the background search and is searched afresh. Its own transposition table keeps it apart from
+# searches elsewhere in the process, and warm from one move to the next.
+class Ponderer:
+
+    def __init__(self, max_depth: int = SEARCH_DEPTH, time_budget_ms: Optional[float] = None,
+                 weights: Weights = MATERIAL, table: TranspositionTable = None):
+        self.max_depth = max_depth
+        self.time_budget_ms = time_budget_ms
+        self.weights = weights
+        self.table = TranspositionTable() if table is None else table
+        self.thread: Optional[threading.Thread] = None
+        self.stop_event = threading.Event()
+        self.predicted: Optional[tuple[Position, Side]] = None
+        self.pondered: Optional[SearchResult] = None
+        self.hits = 0
+        self.misses = 0
+
+    def search(self, board: list[list[int]], side: Side) -> SearchResult:
+        pos = from_board(board)
+        res = self._take(pos, side)
+        if res is None:
+            searcher = Searcher(self.max_depth, self.table, self.time_budget_ms, weights=self.weights)
+            res = searcher.search(pos, side, resume=True)
+        self._ponder_after(pos, side, res)
+        return res
+
+    def best_move(self, board: list[list[int]], side: Side) -> Optional[Move]:
+        res = self.search(board, side)
+        if res.move is None:
+            return None
+        return to_moves([res.move], side, freeze(board))[0]
+
+    def _take(self, pos: Position, side: Side) -> Optional[SearchResult]:
+        if self.thread is None:
+            return None
+        if self.predicted != (pos, side):
+            self.misses += 1
+            self.stop()
+            return None
+        self.hits += 1
+        self.thread.join(None if self.time_budget_ms is None else self.time_budget_ms / 1000)
+        self.stop()
+        return self.pondered
+
+    def _ponder_after(self, pos: Position, side: Side, res: SearchResult):
+        if len(res.pv) < 2:
+            return
+        opposite = side.opposite_side()
+        predicted = apply_move(apply_move(pos, side, res.pv[0]), opposite, res.pv[1])
+        self.predicted = (predicted, side)
+        self.pondered = None
+        self.stop_event = threading.Event()
+        searcher = Searcher(self.max_depth, self.table, weights=self.weights, stop=self.stop_event)
+        self.thread = threading.Thread(target=self._run, args=(searcher, predicted, side), daemon=True)
+        self.thread.start()
+
+    def _run(self, searcher: Searcher, pos: Position, side: Side):
+        self.pondered = searcher.search(pos, side, resume=True)
+
+    def stop(self):
+        # Ends the background search, if any; it stops within a few thousand nodes.
+        if self.thread is None:
+            return
+        self.stop_event.set()
+        self.thread.join()
+        self.thread = None
+        self.predicted = None
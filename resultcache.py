@@ -0,0 +1,231 @@
+import atexit
+import json
+import os
+import queue
+import sqlite3
+import threading
+from typing import NamedTuple, Optional
+
+from checkersanalyser.bitboard import BitMove, Position, apply_move
+from checkersanalyser.common import Side
+from checkersanalyser.movecache import default_cache
+from checkersanalyser.search import SearchResult
+from checkersanalyser.symmetry import canonical, flip_path
+
+# Bump whenever a change to the search or the move generator can change a stored answer; opening a
+# file written by another version empties it.
+ENGINE_VERSION = 3
+DEFAULT_RESULT_ENTRIES = 100000
+WRITE_BATCH = 256
+
+_META = "CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT NOT NULL);"
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    path TEXT,
+    score INTEGER,
+    depth INTEGER,
+    nodes INTEGER,
+    pv TEXT NOT NULL,
+    ties TEXT NOT NULL,
+    used INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_used ON results (used);
+"""
+
+
+class CachedResult(NamedTuple):
+    path: Optional[tuple[int, ...]]
+    score: Optional[int]
+    depth: Optional[int]
+    nodes: Optional[int]
+    pv: tuple[tuple[int, ...], ...] = ()
+    ties: tuple[tuple[int, ...], ...] = ()
+
+
+# Results are stored for the canonical position (see symmetry), so a position and its flipped twin
+# with the other side to move share a row; paths are turned to the caller's side on the way in and out.
+# Ties go to the move generated first, and the twins generate their moves in different orders, so a row
+# also keeps the other moves as good as the best one and each reader takes the first of them in its own
+# order: the answer a search of its own position gives.
+def result_key(pos: Position, side: Side, kind: str, depth: int, *params) -> str:
+    # params are whatever else decides the answer: node budgets, weights, the tablebase file.
+    return "%08x%08x%08x%08x:%s:%d:%r" % (*canonical(pos, side)[0].as_tuple(), kind, depth, params)
+
+
+def _oriented(path: tuple[int, ...], flipped: bool) -> tuple[int, ...]:
+    return flip_path(path) if flipped else path
+
+
+def _find(pos: Position, side: Side, path: tuple[int, ...]) -> Optional[BitMove]:
+    for m in default_cache().moves(pos, side):
+        if m.path == path:
+            return m
+    return None
+
+
+def to_search_result(cached: CachedResult, pos: Position, side: Side) -> Optional[SearchResult]:
+    # None when the stored move is not legal here, which callers treat as a miss.
+    flipped = side == Side.BLACKES
+    move = None if cached.path is None else _find(pos, side, _oriented(cached.path, flipped))
+    if cached.path is not None and move is None:
+        return None
+    if cached.ties:
+        paths = {move.path} | {_oriented(path, flipped) for path in cached.ties}
+        first = next(m for m in default_cache().moves(pos, side) if m.path in paths)
+        if first != move:
+            # The stored line follows the other move; only the move itself is known.
+            return SearchResult(first, cached.score, cached.depth, cached.nodes, (first,) if cached.pv else ())
+    pv = []
+    for path in cached.pv:
+        m = _find(pos, side, _oriented(path, flipped))
+        if m is None:
+            return None
+        pv.append(m)
+        pos = apply_move(pos, side, m)
+        side = side.opposite_side()
+    return SearchResult(move, cached.score, cached.depth, cached.nodes, tuple(pv))
+
+
+def from_search_result(res: SearchResult, side: Side, ties: tuple[BitMove, ...] = ()) -> CachedResult:
+    # ties are the moves as good as res.move, which may be among them.
+    flipped = side == Side.BLACKES
+    return CachedResult(None if res.move is None else _oriented(res.move.path, flipped), res.score, res.depth,
+                        res.nodes, tuple(_oriented(m.path, flipped) for m in res.pv),
+                        tuple(_oriented(m.path, flipped) for m in ties if m != res.move))
+
+
+# Answers of finished searches in an SQLite file, shared by every process that opens it. Lookups
+# read the file directly; stores go to a background thread that writes them in batches and then
+# drops the least recently used rows beyond max_entries. Until written, stores are answered from
+# memory, so a caller always sees its own results.
+class ResultCache:
+
+    def __init__(self, path: str, max_entries: int = DEFAULT_RESULT_ENTRIES, version: int = ENGINE_VERSION):
+        if max_entries < 1:
+            raise ValueError("max_entries must be positive")
+        self.path = path
+        self.max_entries = max_entries
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.unwritten: dict[str, CachedResult] = {}
+        self.writes: queue.Queue = queue.Queue()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        with self.db:
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute(_META)
+            row = self.db.execute("SELECT value FROM meta WHERE name = 'version'").fetchone()
+            if row is None or row[0] != str(version):
+                # Rows of other versions may not even have the same columns.
+                self.db.execute("DROP TABLE IF EXISTS results")
+                self.db.execute("INSERT OR REPLACE INTO meta VALUES ('version', ?)", (str(version),))
+            self.db.executescript(_SCHEMA)
+        self.clock = self.db.execute("SELECT COALESCE(MAX(used), 0) FROM results").fetchone()[0]
+        self.writer = threading.Thread(target=self._write_loop, daemon=True)
+        self.writer.start()
+
+    def __len__(self):
+        self.flush()
+        with self.lock:
+            return self.db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def _tick(self) -> int:
+        self.clock += 1
+        return self.clock
+
+    def get(self, key: str) -> Optional[CachedResult]:
+        with self.lock:
+            res = self.unwritten.get(key)
+            if res is None:
+                row = self.db.execute("SELECT path, score, depth, nodes, pv, ties FROM results WHERE key = ?",
+                                      (key,)).fetchone()
+                if row is not None:
+                    path, score, depth, nodes, pv, ties = row
+                    res = CachedResult(None if path is None else tuple(json.loads(path)), score, depth, nodes,
+                                       tuple(tuple(p) for p in json.loads(pv)),
+                                       tuple(tuple(p) for p in json.loads(ties)))
+            if res is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            used = self._tick()
+        self.writes.put((key, None, used))
+        return res
+
+    def put(self, key: str, res: CachedResult):
+        with self.lock:
+            self.unwritten[key] = res
+            used = self._tick()
+        self.writes.put((key, res, used))
+
+    def _write_loop(self):
+        # Runs until close() queues None, after everything queued before it.
+        while True:
+            batch = [self.writes.get()]
+            while len(batch) < WRITE_BATCH and batch[-1] is not None:
+                try:
+                    batch.append(self.writes.get_nowait())
+                except queue.Empty:
+                    break
+            stop = batch[-1] is None
+            try:
+                self._write(batch[:-1] if stop else batch)
+            finally:
+                for _ in batch:
+                    self.writes.task_done()
+            if stop:
+                return
+
+    def _write(self, batch: list):
+        with self.lock, self.db:
+            for key, res, used in batch:
+                if res is None:
+                    self.db.execute("UPDATE results SET used = ? WHERE key = ?", (used, key))
+                    continue
+                self.db.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                                (key, None if res.path is None else json.dumps(res.path), res.score, res.depth,
+                                 res.nodes, json.dumps(res.pv), json.dumps(res.ties), used))
+                if self.unwritten.get(key) is res:
+                    del self.unwritten[key]
+            excess = self.db.execute("SELECT COUNT(*) FROM results").fetchone()[0] - self.max_entries
+            if excess > 0:
+                self.db.execute("DELETE FROM results WHERE key IN "
+                                "(SELECT key FROM results ORDER BY used LIMIT ?)", (excess,))
+
+    def flush(self):
+        self.writes.join()
+
+    def clear(self):
+        self.flush()
+        with self.lock, self.db:
+            self.db.execute("DELETE FROM results")
+            self.hits = self.misses = 0
+
+    def close(self):
+        if self.writer.is_alive():
+            self.writes.put(None)
+            self.writer.join()
+        with self.lock:
+            self.db.close()
+
+
+_default_result_cache: Optional[ResultCache] = None
+
+
+def default_result_cache() -> Optional[ResultCache]:
+    # Off unless CHECKERSANALYSER_RESULT_CACHE names the database file, which is created on first use.
+    global _default_result_cache
+    path = os.environ.get("CHECKERSANALYSER_RESULT_CACHE")
+    if path and (_default_result_cache is None or _default_result_cache.path != path):
+        if _default_result_cache is not None:
+            _default_result_cache.close()
+        _default_result_cache = ResultCache(path)
+    return _default_result_cache if path else None
+
+
+@atexit.register
+def _close_default():
+    if _default_result_cache is not None:
+        _default_result_cache.close()
@@ -0,0 +1,249 @@
+import threading
+import time
+from typing import NamedTuple, Optional
+
+from checkersanalyser.bitboard import BitMove, Position, apply_move
+from checkersanalyser.common import Side
+from checkersanalyser.evaluate import Weights, MATERIAL, evaluate, evaluate_positions, max_score
+from checkersanalyser.movecache import MoveCache, default_cache
+from checkersanalyser.ordering import MoveOrdering, HeuristicOrdering, tt_first
+from checkersanalyser.tablebase import Tablebase, WIN_SCORE, MAX_DISTANCE, default_tablebase
+from checkersanalyser.ttable import TranspositionTable, EXACT, LOWER, UPPER, MAX_DEPTH, default_table
+
+INFINITY = 1000
+SEARCH_DEPTH = 5
+BUDGET_CHECK_INTERVAL = 1024
+
+
+class SearchAborted(Exception):
+    pass
+
+
+def check_depth(max_depth: int):
+    if max_depth < 1:
+        raise ValueError("max_depth must be at least 1")
+    if max_depth > MAX_DEPTH:
+        raise ValueError(f"max_depth must be at most {MAX_DEPTH}")
+
+
+class SearchResult(NamedTuple):
+    move: Optional[BitMove]
+    score: int
+    depth: int
+    nodes: int
+    pv: tuple[BitMove, ...] = ()
+
+
+class Searcher:
+
+    def __init__(self, max_depth: int = SEARCH_DEPTH, table: TranspositionTable = None,
+                 time_budget_ms: Optional[float] = None, max_nodes: Optional[int] = None, cache: MoveCache = None,
+                 weights: Weights = MATERIAL, tablebase: Tablebase = None, ordering: MoveOrdering = None,
+                 stop: threading.Event = None):
+        check_depth(max_depth)
+        self.tablebase = default_tablebase() if tablebase is None else tablebase
+        if max_score(weights) >= (INFINITY if self.tablebase is None else WIN_SCORE - MAX_DISTANCE):
+            raise ValueError("weights too large for the search window")
+        self.max_depth = max_depth
+        self.table = default_table() if table is None else table
+        self.cache = default_cache() if cache is None else cache
+        self.weights = weights
+        # Material is kept up to date by the positions themselves; other weights are evaluated in
+        # batches, all the children of a node one ply above the horizon at once. Scores that are
+        # not plain material go to the table under keys of their own, as do those of each tablebase.
+        self.batch_leaves = weights != MATERIAL
+        self.key_salt = 0
+        if weights != MATERIAL or self.tablebase is not None:
+            tables = None if self.tablebase is None else self.tablebase.identity()
+            self.key_salt = hash((weights, tables)) & 0xFFFFFFFFFFFFFFFF
+        self.ordering = HeuristicOrdering() if ordering is None else ordering
+        self.time_budget_ms = time_budget_ms
+        self.max_nodes = max_nodes
+        # Setting stop from another thread ends the search like an exhausted budget.
+        self.stop = stop
+        self.nodes = 0
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+        self.deadline = None
+        self.next_check = float('inf')
+
+    def _budget_exhausted(self) -> bool:
+        if self.stop is not None and self.stop.is_set():
+            return True
+        if self.max_nodes is not None and self.nodes >= self.max_nodes:
+            return True
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            return True
+        self.next_check = self.nodes + BUDGET_CHECK_INTERVAL
+        if self.max_nodes is not None:
+            self.next_check = min(self.next_check, self.max_nodes)
+        return False
+
+    def first_move_cutoff_rate(self) -> Optional[float]:
+        # How often the move tried first was good enough for a cutoff, out of all cutoffs.
+        return self.first_move_cutoffs / self.cutoffs if self.cutoffs else None
+
+    def _score(self, pos: Position, side: Side) -> int:
+        return evaluate(pos, side, self.weights) if self.batch_leaves else pos.score(side)
+
+    # Positions without moves are scored by material like any other leaf, except where the tablebase
+    # covers them: there they are lost, as in its own results (see tablebase).
+    def static_score(self, pos: Position, side: Side) -> int:
+        if self.tablebase is not None:
+            score = self.tablebase.score(pos, side)
+            if score is not None:
+                return score
+        return self._score(pos, side)
+
+    def _leaf_scores(self, children: list[Position], side: Side) -> list[int]:
+        scores = evaluate_positions(children, side, self.weights)
+        if self.tablebase is not None:
+            opposite = side.opposite_side()
+            for n, child in enumerate(children):
+                score = self.tablebase.score(child, opposite)
+                if score is not None:
+                    scores[n] = -score
+        return scores
+
+    def _key(self, pos: Position, side: Side) -> int:
+        return pos.side_key(side) ^ self.key_salt
+
+    def negamax(self, pos: Position, side: Side, depth: int, alpha: int, beta: int, ply: int = 1) -> int:
+        if self.nodes >= self.next_check and self._budget_exhausted():
+            raise SearchAborted()
+        self.nodes += 1
+        if self.tablebase is not None:
+            score = self.tablebase.score(pos, side)
+            if score is not None:
+                return score
+        if depth == 0 or pos.winning_side() is not None:
+            return evaluate(pos, side, self.weights) if self.batch_leaves else pos.score(side)
+        key = pos.side_key(side) ^ self.key_salt
+        entry = self.table.probe(key)
+        tt_move = None
+        if entry is not None:
+            # Only results of exactly this depth are reused, so the value stays the fixed-depth
+            # minimax value no matter what earlier searches left in the table.
+            if entry.depth == depth:
+                if entry.bound == EXACT:
+                    return entry.score
+                if entry.bound == LOWER and entry.score >= beta:
+                    return entry.score
+                if entry.bound == UPPER and entry.score <= alpha:
+                    return entry.score
+            tt_move = entry.move
+        moves = self.cache.moves(pos, side)
+        if len(moves) == 0:
+            return self._score(pos, side)
+        opposite = side.opposite_side()
+        best_idx = None
+        order = self.ordering.order(moves, side, tt_move, ply, depth)
+        leaf_scores = None
+        if depth == 1 and self.batch_leaves:
+            leaf_scores = self._leaf_scores([apply_move(pos, side, moves[idx]) for idx in order], side)
+        for n, idx in enumerate(order):
+            if leaf_scores is None:
+                score = -self.negamax(apply_move(pos, side, moves[idx]), opposite, depth - 1, -beta, -alpha, ply + 1)
+            else:
+                # Counted and budgeted like the leaf visits they replace.
+                if self.nodes >= self.next_check and self._budget_exhausted():
+                    raise SearchAborted()
+                self.nodes += 1
+                score = leaf_scores[n]
+            if score >= beta:
+                self.table.store(key, depth, LOWER, score, idx)
+                self.cutoffs += 1
+                if n == 0:
+                    self.first_move_cutoffs += 1
+                self.ordering.cutoff(moves, side, idx, ply, depth)
+                return score
+            if score > alpha:
+                alpha = score
+                best_idx = idx
+        self.table.store(key, depth, UPPER if best_idx is None else EXACT, alpha, best_idx)
+        return alpha
+
+    def search_root(self, pos: Position, side: Side, moves: tuple[BitMove, ...], order: list[int],
+                    depth: int) -> tuple[int, int]:
+        # Ties go to the move generated first, like the plain minimax did. Moves generated before
+        # the current best are searched with a window one point lower so that a tie is detected.
+        self.nodes += 1
+        opposite = side.opposite_side()
+        best_idx, best_score = None, -INFINITY
+        for idx in order:
+            child = apply_move(pos, side, moves[idx])
+            if best_idx is None:
+                score = -self.negamax(child, opposite, depth - 1, -INFINITY, INFINITY)
+            else:
+                lower = best_score - 1 if idx < best_idx else best_score
+                score = -self.negamax(child, opposite, depth - 1, -INFINITY, -lower)
+            if best_idx is None or score > best_score or (score == best_score and idx < best_idx):
+                best_idx, best_score = idx, score
+        self.table.store(self._key(pos, side), depth, EXACT, best_score, best_idx)
+        return best_idx, best_score
+
+    def tied_root_moves(self, pos: Position, side: Side, depth: int, score: int) -> list[int]:
+        # The moves worth score at depth, which a search of the position found to be the best. Each is
+        # one null window search, mostly answered by the entries that search left in the table.
+        opposite = side.opposite_side()
+        return [idx for idx, m in enumerate(self.cache.moves(pos, side))
+                if -self.negamax(apply_move(pos, side, m), opposite, depth - 1, -score, 1 - score) >= score]
+
+    def principal_variation(self, pos: Position, side: Side, depth: int) -> tuple[BitMove, ...]:
+        # The search keeps no tree: the line is read back from the table, following the exact
+        # entries the last pass left, and may come out shorter if some were replaced since.
+        pv = []
+        while depth > 0:
+            entry = self.table.probe(self._key(pos, side))
+            if entry is None or entry.depth != depth or entry.bound != EXACT or entry.move is None:
+                break
+            moves = self.cache.moves(pos, side)
+            if entry.move >= len(moves):
+                break
+            pv.append(moves[entry.move])
+            pos = apply_move(pos, side, moves[entry.move])
+            side = side.opposite_side()
+            depth -= 1
+        return tuple(pv)
+
+    def search(self, pos: Position, side: Side, resume: bool = False) -> SearchResult:
+        # Anytime: once depth 1 is done, running out of time or nodes returns the result of the last
+        # depth that was searched completely. With resume, iterative deepening starts at the depth of an
+        # exact result for the position already in the table, which an earlier search left there; that
+        # depth comes straight from the table's entries, and only the deeper ones are searched.
+        self.nodes = 0
+        self.cutoffs = self.first_move_cutoffs = 0
+        self.next_check = float('inf')
+        if self.time_budget_ms is not None:
+            self.deadline = time.monotonic() + self.time_budget_ms / 1000
+        self.table.new_search()
+        self.ordering.new_search()
+        moves = self.cache.moves(pos, side)
+        if len(moves) == 0:
+            return SearchResult(None, self.static_score(pos, side), 0, self.nodes)
+        entry = self.table.probe(self._key(pos, side))
+        best_idx = None if entry is None else entry.move
+        best_score = 0
+        reached = 0
+        max_depth = self.max_depth
+        if self.tablebase is not None and self.tablebase.covers(pos):
+            # Every child is in the tablebase too, so one ply finds the quickest win or slowest loss.
+            max_depth = 1
+        start = 1
+        if resume and entry is not None and entry.bound == EXACT and entry.depth > 1:
+            # The table already answers the first resumed depth, so the budget holds from the first node.
+            # An answer at least as deep as asked for is returned as it is, and nothing is searched.
+            self.next_check = 0
+            best_score, reached = entry.score, entry.depth
+            start = entry.depth if entry.depth <= max_depth else max_depth + 1
+        for depth in range(start, max_depth + 1):
+            try:
+                best_idx, best_score = self.search_root(pos, side, moves, tt_first(len(moves), best_idx), depth)
+            except SearchAborted:
+                break
+            reached = depth
+            if (self.time_budget_ms is not None or self.max_nodes is not None or self.stop is not None) \
+                    and self._budget_exhausted():
+                break
+        pv = self.principal_variation(pos, side, reached) if reached else (moves[best_idx],)
+        return SearchResult(moves[best_idx], best_score, reached, self.nodes, pv)
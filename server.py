@@ -0,0 +1,262 @@
+import asyncio
+import json
+import time
+from collections import deque
+from concurrent.futures import Executor
+from typing import Optional
+
+from checkersanalyser.batch import parse_side
+from checkersanalyser.common import Side
+from checkersanalyser.moveanalyser import MoveAnalyser
+from checkersanalyser.movemaker import deduce_min_max_result
+from checkersanalyser.parallel import get_pool
+from checkersanalyser.search import SEARCH_DEPTH
+
+MAX_BODY_BYTES = 1 << 20
+LATENCY_WINDOW = 1000
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 413: "Payload Too Large",
+           500: "Internal Server Error", 503: "Service Unavailable", 504: "Gateway Timeout"}
+
+
+class HttpError(Exception):
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+# The jobs run in the worker processes, so they take and return plain data.
+def best_move_job(board: list[list[int]], side_name: str, depth: int, time_budget_ms: Optional[float],
+                  max_nodes: Optional[int]) -> dict:
+    res = deduce_min_max_result(board, Side[side_name], depth, time_budget_ms, max_nodes)
+    return {
+        "move": None if res.move is None else res.move.to_list(),
+        "score": res.score,
+        "depth": res.depth,
+        "nodes": res.nodes,
+        "pv": [m.to_list() for m in res.pv],
+    }
+
+
+def analyse_job(fromm: list[list[int]], to: list[list[int]], side_name: str) -> dict:
+    moves = MoveAnalyser(fromm, to).calculate_move_for_side(Side[side_name])
+    return {"moves": [m.to_list() for m in moves]}
+
+
+def _board(value) -> list[list[int]]:
+    if not isinstance(value, list) or len(value) != 8 or \
+            any(not isinstance(row, list) or len(row) != 8 or any(v not in (0, 1, 2, 3, 4) for v in row)
+                for row in value):
+        raise ValueError("a board is 8 rows of 8 values from 0 to 4")
+    return value
+
+
+def _optional_number(request: dict, name: str):
+    value = request.get(name)
+    if value is not None and (isinstance(value, bool) or not isinstance(value, (int, float))):
+        raise ValueError(f"{name} must be a number")
+    return value
+
+
+def _best_move_args(request: dict) -> tuple:
+    depth = request.get("depth", SEARCH_DEPTH)
+    if isinstance(depth, bool) or not isinstance(depth, int) or not 1 <= depth <= 20:
+        raise ValueError("depth must be an integer from 1 to 20")
+    max_nodes = _optional_number(request, "max_nodes")
+    return (_board(request["board"]), parse_side(request["side"]).name, depth,
+            _optional_number(request, "time_budget_ms"), None if max_nodes is None else int(max_nodes))
+
+
+def _analyse_args(request: dict) -> tuple:
+    return _board(request["from"]), _board(request["to"]), parse_side(request["side"]).name
+
+
+ENDPOINTS = {
+    "/best-move": (best_move_job, _best_move_args),
+    "/analyse": (analyse_job, _analyse_args),
+}
+
+
+def _bounded(job, args: tuple, remaining_ms: float) -> tuple:
+    # A search gets no longer than its requests are willing to wait, so an abandoned one ends too.
+    if job is not best_move_job:
+        return args
+    board, side_name, depth, time_budget_ms, max_nodes = args
+    budget = remaining_ms if time_budget_ms is None else min(time_budget_ms, remaining_ms)
+    return board, side_name, depth, max(0.0, budget), max_nodes
+
+
+def _percentile(ordered: list[float], q: float) -> Optional[float]:
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+# Requests wait in a bounded queue that a fixed number of tasks drain into the executor, one job each.
+# A request identical to one queued or running waits for that computation instead of adding its own.
+# A full queue answers 503 straight away, and a request still waiting at its deadline answers 504; a
+# job nobody waits for any more is dropped before it starts, and a search stops at the last deadline of
+# the requests waiting for it when it started.
+class AnalysisServer:
+
+    def __init__(self, workers: Optional[int] = None, max_queue: int = 64, deadline_ms: float = 30000,
+                 executor: Executor = None):
+        self.executor = get_pool(workers) if executor is None else executor
+        self.concurrency = getattr(self.executor, "_max_workers", None) or workers or 1
+        self.max_queue = max_queue
+        self.deadline_ms = deadline_ms
+        self.queue: Optional[asyncio.Queue] = None
+        self.pending: dict[tuple, asyncio.Future] = {}
+        self.waiters: dict[tuple, int] = {}
+        self.expiries: dict[tuple, float] = {}
+        self.latencies: deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self.counters = {"requests": 0, "computations": 0, "coalesced": 0, "rejected": 0, "timeouts": 0,
+                         "errors": 0}
+        self.running = 0
+        self.server: Optional[asyncio.AbstractServer] = None
+        self.tasks: list[asyncio.Task] = []
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8080) -> asyncio.AbstractServer:
+        self.queue = asyncio.Queue(self.max_queue)
+        self.tasks = [asyncio.create_task(self._drain()) for _ in range(self.concurrency)]
+        self.server = await asyncio.start_server(self._handle, host, port)
+        return self.server
+
+    @property
+    def port(self) -> int:
+        return self.server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        self.server.close()
+        await self.server.wait_closed()
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+
+    def metrics(self) -> dict:
+        ordered = sorted(self.latencies)
+        return dict(self.counters, queue_depth=self.queue.qsize(), running=self.running,
+                    latency_ms={"p50": _percentile(ordered, 0.5), "p90": _percentile(ordered, 0.9),
+                                "p99": _percentile(ordered, 0.99)})
+
+    async def _drain(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            key, job, args, future = await self.queue.get()
+            if future.cancelled():
+                continue
+            self.running += 1
+            self.counters["computations"] += 1
+            args = _bounded(job, args, (self.expiries[key] - loop.time()) * 1000)
+            try:
+                res = await loop.run_in_executor(self.executor, job, *args)
+                if not future.done():
+                    future.set_result(res)
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            finally:
+                self.running -= 1
+                self._forget(key, future)
+
+    def _forget(self, key: tuple, future: asyncio.Future):
+        # A later identical request may have replaced the entry; that one stays.
+        if self.pending.get(key) is future:
+            del self.pending[key]
+            del self.expiries[key]
+
+    async def submit(self, path: str, request: dict, deadline_ms: Optional[float] = None):
+        job, parse = ENDPOINTS[path]
+        args = parse(request)
+        key = (path, json.dumps(args))
+        loop = asyncio.get_running_loop()
+        deadline = (self.deadline_ms if deadline_ms is None else deadline_ms) / 1000
+        future = self.pending.get(key)
+        if future is None:
+            if self.queue.full():
+                self.counters["rejected"] += 1
+                raise HttpError(503, "the queue is full")
+            future = loop.create_future()
+            self.pending[key] = future
+            self.expiries[key] = loop.time() + deadline
+            self.queue.put_nowait((key, job, args, future))
+        else:
+            self.counters["coalesced"] += 1
+            self.expiries[key] = max(self.expiries[key], loop.time() + deadline)
+        self.waiters[key] = self.waiters.get(key, 0) + 1
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), deadline)
+        except asyncio.TimeoutError:
+            self.counters["timeouts"] += 1
+            raise HttpError(504, "the deadline passed")
+        finally:
+            self.waiters[key] -= 1
+            if self.waiters[key] == 0:
+                del self.waiters[key]
+                if not future.done():
+                    # Nobody waits for it: a queued job is skipped, a running one ends at its budget
+                    # unseen, and a new identical request starts afresh.
+                    future.cancel()
+                    self._forget(key, future)
+
+    async def _respond(self, path: str, method: str, body: bytes) -> tuple[int, dict]:
+        if path == "/metrics":
+            if method != "GET":
+                raise HttpError(405, "use GET")
+            return 200, self.metrics()
+        if path not in ENDPOINTS:
+            raise HttpError(404, f"no endpoint {path}")
+        if method != "POST":
+            raise HttpError(405, "use POST")
+        self.counters["requests"] += 1
+        start = time.perf_counter()
+        try:
+            request = json.loads(body)
+            if not isinstance(request, dict):
+                raise ValueError("the body must be a JSON object")
+            deadline_ms = _optional_number(request, "deadline_ms")
+            res = await self.submit(path, request, deadline_ms)
+        except (ValueError, KeyError, TypeError) as e:
+            raise HttpError(400, f"{type(e).__name__}: {e}")
+        finally:
+            # Failed requests count too, timeouts above all, or the slowest would never show.
+            self.latencies.append((time.perf_counter() - start) * 1000)
+        return 200, res
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            try:
+                method, path, _ = (await reader.readline()).decode("latin-1").split(" ", 2)
+                length = 0
+                while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    name, _, value = line.decode("latin-1").partition(":")
+                    if name.strip().lower() == "content-length":
+                        length = int(value)
+                if length > MAX_BODY_BYTES:
+                    raise HttpError(413, "the body is too large")
+                body = await reader.readexactly(length) if length else b""
+                status, res = await self._respond(path.split("?", 1)[0], method, body)
+            except HttpError as e:
+                status, res = e.status, {"error": str(e)}
+            except (ValueError, asyncio.IncompleteReadError):
+                status, res = 400, {"error": "malformed request"}
+            except Exception as e:
+                self.counters["errors"] += 1
+                status, res = 500, {"error": f"{type(e).__name__}: {e}"}
+            data = json.dumps(res).encode()
+            writer.write(f"HTTP/1.1 {status} {REASONS[status]}\r\nContent-Type: application/json\r\n"
+                         f"Content-Length: {len(data)}\r\nConnection: close\r\n\r\n".encode() + data)
+            await writer.drain()
+        finally:
+            writer.close()
+
+
+async def serve(host: str = "127.0.0.1", port: int = 8080, workers: Optional[int] = None, max_queue: int = 64,
+                deadline_ms: float = 30000):
+    server = AnalysisServer(workers, max_queue, deadline_ms)
+    await server.start(host, port)
+    try:
+        await server.server.serve_forever()
+    finally:
+        await server.close()
@@ -0,0 +1,78 @@
+from typing import Optional, Union
+
+from pyrsistent import freeze
+
+from checkersanalyser.bitboard import BitMove, Position, from_board, to_board, apply_move
+from checkersanalyser.common import Move, Side
+from checkersanalyser.evaluate import Weights, MATERIAL
+from checkersanalyser.formats import INITIAL_FEN, parse_fen_position
+from checkersanalyser.movecache import default_cache, to_moves
+from checkersanalyser.moveanalyser import _moves_to
+from checkersanalyser.ordering import HeuristicOrdering
+from checkersanalyser.search import Searcher, SearchResult, SEARCH_DEPTH
+from checkersanalyser.ttable import TranspositionTable
+
+
+# One game, searched ply after ply. The position is kept as a bitboard and moved forward by the moves
+# played, and the transposition table and the move ordering statistics carry over from one search to
+# the next. The positions two plies on were searched last time to two plies less, so each search
+# resumes from those results and only searches the extra depth.
+class GameSession:
+
+    def __init__(self, board: Optional[list[list[int]]] = None, side: Side = Side.WHITES,
+                 max_depth: int = SEARCH_DEPTH, time_budget_ms: Optional[float] = None,
+                 weights: Weights = MATERIAL, table: TranspositionTable = None):
+        # Without a board, the game starts from the initial placement, with side to move as for any board.
+        self.position = parse_fen_position(INITIAL_FEN)[0] if board is None else from_board(board)
+        self.side = side
+        self.max_depth = max_depth
+        self.time_budget_ms = time_budget_ms
+        self.weights = weights
+        self.table = TranspositionTable() if table is None else table
+        self.ordering = HeuristicOrdering()
+        self.history: list[BitMove] = []
+        self.nodes = 0
+
+    @property
+    def board(self) -> list[list[int]]:
+        return to_board(self.position)
+
+    def legal_moves(self) -> tuple[BitMove, ...]:
+        return default_cache().moves(self.position, self.side)
+
+    def search(self) -> SearchResult:
+        searcher = Searcher(self.max_depth, self.table, self.time_budget_ms, weights=self.weights,
+                            ordering=self.ordering)
+        res = searcher.search(self.position, self.side, resume=True)
+        self.nodes += res.nodes
+        return res
+
+    def best_move(self) -> Optional[Move]:
+        res = self.search()
+        if res.move is None:
+            return None
+        return to_moves([res.move], self.side, freeze(self.board))[0]
+
+    def play(self, move: Union[BitMove, Move, list[tuple[int, int]]]) -> BitMove:
+        # A move of the side to move, as a BitMove, a Move or the squares of its path.
+        path = move.to_list() if isinstance(move, (BitMove, Move)) else [tuple(c) for c in move]
+        for m in self.legal_moves():
+            if m.to_list() == path:
+                self._advance(m, apply_move(self.position, self.side, m))
+                return m
+        raise ValueError(f"{path} is not a legal move for {self.side}")
+
+    def observe(self, board: list[list[int]]) -> BitMove:
+        # The board after the side to move has played, as read from the game, where a newly crowned
+        # king may still show as a man.
+        target = from_board(board)
+        moves = _moves_to(self.position, self.side, target)
+        if not moves:
+            raise ValueError(f"no legal move for {self.side} leads to the board")
+        self._advance(moves[0], apply_move(self.position, self.side, moves[0]))
+        return moves[0]
+
+    def _advance(self, move: BitMove, pos: Position):
+        self.history.append(move)
+        self.position = pos
+        self.side = self.side.opposite_side()
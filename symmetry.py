@@ -0,0 +1,53 @@
+from checkersanalyser.bitboard import BitMove, Position
+from checkersanalyser.common import Side
+
+# The board has one symmetry that keeps the rules: turning it half a turn and swapping the colours,
+# which makes the same problem with the other side to move. Mirroring it left to right would put the
+# pieces on the light squares. Half a turn takes square sq to 31 - sq, so bitboards reverse their bits.
+# Canonical positions have whites to move.
+
+_REVERSED_BYTES = [int(f"{b:08b}"[::-1], 2) for b in range(256)]
+
+
+def flip_bits(bb: int) -> int:
+    return (_REVERSED_BYTES[bb & 0xFF] << 24 | _REVERSED_BYTES[bb >> 8 & 0xFF] << 16 |
+            _REVERSED_BYTES[bb >> 16 & 0xFF] << 8 | _REVERSED_BYTES[bb >> 24])
+
+
+def flip_square(sq: int) -> int:
+    return 31 - sq
+
+
+def flip_coords(c: tuple[int, int]) -> tuple[int, int]:
+    return 7 - c[0], 7 - c[1]
+
+
+def flip_position(pos: Position) -> Position:
+    c = pos.counts
+    return Position(flip_bits(pos.black_men), flip_bits(pos.black_kings), flip_bits(pos.white_men),
+                    flip_bits(pos.white_kings), counts=(c[2], c[3], c[0], c[1]))
+
+
+def flip_move(m: BitMove) -> BitMove:
+    return BitMove(tuple(31 - sq for sq in m.path), flip_bits(m.captured), m.promotes)
+
+
+def flip_path(path: tuple[int, ...]) -> tuple[int, ...]:
+    return tuple(31 - sq for sq in path)
+
+
+def flip_board(board) -> list[list[int]]:
+    swap = (0, 3, 4, 1, 2)
+    return [[swap[v] for v in reversed(row)] for row in reversed(board)]
+
+
+def canonical(pos: Position, side: Side) -> tuple[Position, bool]:
+    # The position as whites to move, and whether it had to be flipped to get there.
+    if side == Side.WHITES:
+        return pos, False
+    return flip_position(pos), True
+
+
+def canonical_key(pos: Position, side: Side) -> tuple[int, bool]:
+    pos, flipped = canonical(pos, side)
+    return pos.key, flipped
@@ -0,0 +1,252 @@
+import itertools
+import mmap
+import os
+from array import array
+from math import comb
+from typing import Optional
+
+from checkersanalyser.bitboard import Position, ROW_0, ROW_7, generate_moves, apply_move
+from checkersanalyser.common import Side
+from checkersanalyser.symmetry import canonical
+
+DRAW, WIN, LOSS = 1, 2, 3
+MAX_DISTANCE = 126
+
+MAGIC = b"CATB"
+VERSION = 2
+HEADER_BYTES = 8
+
+# Search scores of tablebase results: a win is worth more than any material, sooner wins more.
+WIN_SCORE = 900
+
+_BINOMIAL = [[comb(n, k) for k in range(33)] for n in range(33)]
+
+
+# Positions with k pieces are numbered by the set of occupied squares (combinatorial number system)
+# and the piece on each of them; the tables for 2, 3, ... pieces follow each other. Only positions
+# with whites to move are stored, blacks to move is read from the flipped position (see symmetry).
+# A position stores one byte: 0 where there is nothing (a man on its promotion row, a side without
+# pieces), DRAW, or WIN/LOSS for the side to move together with the distance in plies.
+# Results follow the rules of the game: a side left without pieces or without a move has lost. The
+# search scores those ends by material instead, as the plain minimax always has, so a search with a
+# tablebase can rate a blocked position inside the tablebase as lost and a larger one as even.
+def _table_size(pieces: int) -> int:
+    return comb(32, pieces) * 4 ** pieces
+
+
+def _bases(max_pieces: int) -> list[int]:
+    bases = [0, 0, 0]
+    for pieces in range(2, max_pieces + 1):
+        bases.append(bases[-1] + _table_size(pieces))
+    return bases
+
+
+def _encode(result: int, distance: int) -> int:
+    if result == DRAW:
+        return DRAW
+    return 2 * min(distance, MAX_DISTANCE) + result
+
+
+def decode(value: int) -> Optional[tuple[int, int]]:
+    if value == 0:
+        return None
+    if value == DRAW:
+        return DRAW, 0
+    return (WIN if value % 2 == 0 else LOSS), (value - 2) // 2
+
+
+def position_index(pos: Position, side: Side, bases: list[int]) -> int:
+    pos = canonical(pos, side)[0]
+    pieces = sorted((sq, kind) for kind, bb in enumerate(pos.as_tuple()) for sq in _bit_squares(bb))
+    rank = types = 0
+    for i, (sq, kind) in enumerate(pieces):
+        rank += _BINOMIAL[sq][i + 1]
+        types += kind << 2 * i
+    return bases[len(pieces)] + (rank << 2 * len(pieces)) + types
+
+
+def _bit_squares(bb: int):
+    while bb:
+        low = bb & -bb
+        yield low.bit_length() - 1
+        bb ^= low
+
+
+def _positions(pieces: int):
+    # In index order, with None for the numbers that are not positions: the square sets in the order of
+    # their rank, and the pieces counting up with the one on the lowest square changing fastest.
+    for squares in sorted(itertools.combinations(range(32), pieces), key=lambda c: c[::-1]):
+        for reversed_kinds in itertools.product(range(4), repeat=pieces):
+            kinds = reversed_kinds[::-1]
+            bbs = [0, 0, 0, 0]
+            for sq, kind in zip(squares, kinds):
+                bbs[kind] |= 1 << sq
+            valid = (bbs[0] | bbs[1]) and (bbs[2] | bbs[3]) and not bbs[0] & ROW_0 and not bbs[2] & ROW_7
+            yield Position(*bbs) if valid else None
+
+
+def _solve(pieces: int, values: bytearray, bases: list[int]):
+    # Retrograde analysis over the explicit move graph of one table. Results of captures are read from
+    # the smaller tables already solved. Positions are settled in order of distance: a loss at d makes
+    # its predecessors wins at d + 1, and a position whose moves all lead to wins is lost at one more
+    # than the longest of them. Whatever is left unsettled is a draw.
+    base, size = bases[pieces], _table_size(pieces)
+    succ_start = array('i', bytes(4 * (size + 1)))
+    succ = array('i')
+    remaining = array('i', bytes(4 * size))
+    longest = array('i', [-1]) * size
+    escapes = bytearray(size)
+    valid = bytearray(size)
+    buckets: list[list[tuple[int, int]]] = []
+
+    def push(distance: int, i: int, result: int):
+        while len(buckets) <= distance:
+            buckets.append([])
+        buckets[distance].append((i, result))
+
+    side, opposite = Side.WHITES, Side.BLACKES
+    for i, pos in enumerate(_positions(pieces)):
+        succ_start[i] = len(succ)
+        if pos is None:
+            continue
+        valid[i] = 1
+        moves = generate_moves(pos, side)
+        if len(moves) == 0:
+            push(0, i, LOSS)
+            continue
+        best_win = None
+        for m in moves:
+            child = apply_move(pos, side, m)
+            if child.material(opposite) == 0:
+                best_win = 1
+                continue
+            child_index = position_index(child, opposite, bases)
+            if sum(child.counts) == pieces:
+                succ.append(child_index - base)
+                continue
+            result, distance = decode(values[child_index])
+            if result == LOSS:
+                best_win = distance + 1 if best_win is None else min(best_win, distance + 1)
+            elif result == WIN:
+                longest[i] = max(longest[i], distance)
+            else:
+                escapes[i] = 1
+        remaining[i] = len(succ) - succ_start[i]
+        if best_win is not None:
+            push(best_win, i, WIN)
+        elif remaining[i] == 0 and not escapes[i]:
+            push(longest[i] + 1, i, LOSS)
+    succ_start[size] = len(succ)
+
+    pred_start = array('i', bytes(4 * (size + 1)))
+    for child in succ:
+        pred_start[child + 1] += 1
+    for i in range(size):
+        pred_start[i + 1] += pred_start[i]
+    fill = array('i', pred_start)
+    pred = array('i', bytes(4 * len(succ)))
+    for i in range(size):
+        for k in range(succ_start[i], succ_start[i + 1]):
+            child = succ[k]
+            pred[fill[child]] = i
+            fill[child] += 1
+
+    settled = bytearray(size)
+    for distance, bucket in enumerate(buckets):
+        for i, result in bucket:
+            if settled[i]:
+                continue
+            settled[i] = result
+            values[base + i] = _encode(result, distance)
+            for k in range(pred_start[i], pred_start[i + 1]):
+                p = pred[k]
+                if settled[p]:
+                    continue
+                if result == LOSS:
+                    push(distance + 1, p, WIN)
+                    continue
+                remaining[p] -= 1
+                longest[p] = max(longest[p], distance)
+                if remaining[p] == 0 and not escapes[p]:
+                    push(longest[p] + 1, p, LOSS)
+    for i in range(size):
+        if valid[i] and not settled[i]:
+            values[base + i] = DRAW
+
+
+def build(path: str, max_pieces: int = 3):
+    bases = _bases(max_pieces)
+    values = bytearray(bases[-1])
+    for pieces in range(2, max_pieces + 1):
+        _solve(pieces, values, bases)
+    with open(path, "wb") as f:
+        f.write(MAGIC + bytes([VERSION, max_pieces, 0, 0]))
+        f.write(values)
+
+
+class Tablebase:
+
+    def __init__(self, path: str):
+        self.path = path
+        self.data = None
+        self.max_pieces = None
+        self.bases = None
+        self.probes = 0
+
+    def _open(self):
+        # The file is mapped on the first probe, and the OS pages in only the parts that get probed.
+        with open(self.path, "rb") as f:
+            header = f.read(HEADER_BYTES)
+            if header[:4] != MAGIC or header[4] != VERSION:
+                raise ValueError(f"{self.path} is not a tablebase of version {VERSION}")
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.max_pieces = header[5]
+        self.bases = _bases(self.max_pieces)
+
+    def identity(self) -> tuple[str, int]:
+        # Which tables the results come from, for the keys of anything worked out from them.
+        if self.data is None:
+            self._open()
+        return self.path, self.max_pieces
+
+    def covers(self, pos: Position) -> bool:
+        if self.data is None:
+            self._open()
+        return sum(pos.counts) <= self.max_pieces
+
+    def probe(self, pos: Position, side: Side) -> Optional[tuple[int, int]]:
+        # (result, distance) for the side to move, or None when the position is not in the tablebase.
+        if not self.covers(pos):
+            return None
+        self.probes += 1
+        if pos.material(side) == 0:
+            return LOSS, 0
+        if pos.material(side.opposite_side()) == 0:
+            return WIN, 0
+        return decode(self.data[HEADER_BYTES + position_index(pos, side, self.bases)])
+
+    def score(self, pos: Position, side: Side) -> Optional[int]:
+        res = self.probe(pos, side)
+        if res is None:
+            return None
+        result, distance = res
+        if result == DRAW:
+            return 0
+        return WIN_SCORE - distance if result == WIN else distance - WIN_SCORE
+
+    def close(self):
+        if self.data is not None:
+            self.data.close()
+            self.data = None
+
+
+_default_tablebase: Optional[Tablebase] = None
+
+
+def default_tablebase() -> Optional[Tablebase]:
+    # Off unless CHECKERSANALYSER_TABLEBASE names a file built with build().
+    global _default_tablebase
+    path = os.environ.get("CHECKERSANALYSER_TABLEBASE")
+    if path and (_default_tablebase is None or _default_tablebase.path != path):
+        _default_tablebase = Tablebase(path)
+    return _default_tablebase if path else None
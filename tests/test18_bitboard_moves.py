@@ -0,0 +1,40 @@
+from pyrsistent import freeze
+
+from checkersanalyser.bitboard import from_board, to_board, generate_moves, apply_move
+from checkersanalyser.common import Side
+from checkersanalyser.movemaker import _generate_complete_player_moves, execute_move
+
+
+def test():
+    board = [
+        [0, 0, 0, 0, 2, 0, 0, 0],  # 0
+        [0, 3, 0, 0, 0, 1, 0, 0],  # 1
+        [0, 0, 1, 0, 0, 0, 3, 0],  # 2
+        [0, 0, 0, 4, 0, 4, 0, 3],  # 3
+        [0, 0, 0, 0, 0, 0, 2, 0],  # 4
+        [0, 3, 0, 0, 0, 3, 0, 1],
+        [1, 0, 0, 0, 0, 0, 0, 0],
+        [0, 1, 0, 4, 0, 4, 0, 0]
+    ]
+
+    pos = from_board(board)
+    assert to_board(pos) == board
+
+    for side in (Side.WHITES, Side.BLACKES):
+        expected = [m.to_list() for m in _generate_complete_player_moves(freeze(board), side)]
+        moves = generate_moves(pos, side)
+        print(moves)
+        assert [m.to_list() for m in moves] == expected
+        for m in moves:
+            res = execute_move(freeze(board), m.to_list(), side)
+            assert to_board(apply_move(pos, side, m)) == [list(row) for row in res]
+
+    # Boards the bitboards cannot hold are refused rather than read with pieces missing.
+    for i, j, v in ((0, 1, 1), (4, 4, 5), (4, 4, -1)):
+        bad = [list(row) for row in board]
+        bad[i][j] = v
+        try:
+            from_board(bad)
+            assert False, (i, j, v)
+        except ValueError as e:
+            print(e)
@@ -0,0 +1,34 @@
+from checkersanalyser.bitboard import from_board, generate_moves, apply_move
+from checkersanalyser.common import Side
+from checkersanalyser.search import Searcher
+
+
+def minimax(pos, side, depth):
+    if depth == 0 or pos.winning_side() is not None:
+        return pos.score(side)
+    moves = generate_moves(pos, side)
+    if len(moves) == 0:
+        return pos.score(side)
+    return max(-minimax(apply_move(pos, side, m), side.opposite_side(), depth - 1) for m in moves)
+
+
+def test():
+    board = [
+        [0, 0, 0, 0, 0, 0, 0, 0],  # 0
+        [0, 3, 0, 3, 0, 3, 0, 0],  # 1
+        [0, 0, 3, 0, 0, 0, 3, 0],  # 2
+        [0, 3, 0, 0, 0, 0, 0, 0],  # 3
+        [0, 0, 1, 0, 1, 0, 0, 0],  # 4
+        [0, 1, 0, 0, 0, 3, 0, 1],
+        [1, 0, 1, 0, 0, 0, 1, 0],
+        [0, 0, 0, 0, 0, 1, 0, 0]
+    ]
+
+    pos = from_board(board)
+    moves = generate_moves(pos, Side.WHITES)
+    for depth in range(1, 6):
+        scores = [-minimax(apply_move(pos, Side.WHITES, m), Side.BLACKES, depth - 1) for m in moves]
+        res = Searcher(depth).search(pos, Side.WHITES)
+        print(depth, res)
+        assert res.score == max(scores)
+        assert res.move == moves[scores.index(max(scores))]
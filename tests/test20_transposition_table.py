@@ -0,0 +1,46 @@
+from checkersanalyser.bitboard import from_board, to_board, generate_moves, apply_move
+from checkersanalyser.common import Side
+from checkersanalyser.search import Searcher
+from checkersanalyser.ttable import TranspositionTable, EXACT, LOWER
+
+
+def test():
+    board = [
+        [0, 0, 0, 0, 2, 0, 0, 0],  # 0
+        [0, 3, 0, 0, 0, 1, 0, 0],  # 1
+        [0, 0, 1, 0, 0, 0, 3, 0],  # 2
+        [0, 0, 0, 4, 0, 4, 0, 3],  # 3
+        [0, 0, 0, 0, 0, 0, 2, 0],  # 4
+        [0, 3, 0, 0, 0, 3, 0, 1],
+        [1, 0, 0, 0, 0, 0, 0, 0],
+        [0, 1, 0, 4, 0, 4, 0, 0]
+    ]
+
+    pos = from_board(board)
+    for side in (Side.WHITES, Side.BLACKES):
+        for m in generate_moves(pos, side):
+            child = apply_move(pos, side, m)
+            assert child.key == from_board(to_board(child)).key
+    assert pos.side_key(Side.WHITES) != pos.side_key(Side.BLACKES)
+
+    table = TranspositionTable(1024)
+    assert len(table) == 64
+    table.store(5, 3, EXACT, -7, 2)
+    table.store(5 + 64, 2, LOWER, 4, None)
+    entry = table.probe(5)
+    assert (entry.depth, entry.bound, entry.score, entry.move) == (3, EXACT, -7, 2)
+    assert table.probe(5 + 64) is None
+    table.new_search()
+    table.store(5 + 64, 2, LOWER, 4, None)
+    assert table.probe(5) is None
+    assert table.probe(5 + 64).move is None
+
+    fresh = Searcher(table=TranspositionTable(1 << 16)).search(pos, Side.WHITES)
+    shared = TranspositionTable(1 << 16)
+    Searcher(table=shared).search(pos, Side.BLACKES)
+    first = Searcher(table=shared).search(pos, Side.WHITES)
+    second = Searcher(table=shared).search(pos, Side.WHITES)
+    print(fresh, first, second)
+    assert fresh.move == first.move == second.move
+    assert fresh.score == first.score == second.score
+    assert second.nodes < fresh.nodes
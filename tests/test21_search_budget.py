@@ -0,0 +1,50 @@
+from checkersanalyser.common import Side
+from checkersanalyser.movemaker import deduce_min_max_result, deduce_best_min_max_move, deduce_best_move, \
+    deduce_best_complete_move
+from checkersanalyser.search import Searcher
+from checkersanalyser.bitboard import from_board
+from checkersanalyser.ttable import TranspositionTable
+
+
+def test():
+    board = [
+        [3, 0, 3, 0, 3, 0, 3, 0],  # 0
+        [0, 3, 0, 3, 0, 3, 0, 3],  # 1
+        [3, 0, 3, 0, 3, 0, 3, 0],  # 2
+        [0, 0, 0, 0, 0, 0, 0, 0],  # 3
+        [0, 0, 0, 0, 0, 0, 0, 0],  # 4
+        [0, 1, 0, 1, 0, 1, 0, 1],  # 5
+        [1, 0, 1, 0, 1, 0, 1, 0],
+        [0, 1, 0, 1, 0, 1, 0, 1]
+    ]
+
+    res = deduce_min_max_result(board, Side.WHITES, max_depth=3)
+    print(res)
+    assert res.depth == 3
+
+    pos = from_board(board)
+    full = [Searcher(d, TranspositionTable(1 << 16)).search(pos, Side.WHITES) for d in range(1, 8)]
+    limit = full[3].nodes + 1
+    res = Searcher(20, TranspositionTable(1 << 16), max_nodes=limit).search(pos, Side.WHITES)
+    print(res)
+    assert 1 <= res.depth < 20
+    assert res.nodes <= limit
+    assert res.move == full[res.depth - 1].move
+
+    res = Searcher(50, TranspositionTable(1 << 16), time_budget_ms=50).search(pos, Side.WHITES)
+    print(res)
+    assert 1 <= res.depth < 50
+
+    assert repr(deduce_best_min_max_move(board, Side.WHITES, max_depth=1)) == repr(full[0].move)
+
+    for deduce in (deduce_min_max_result, deduce_best_move, deduce_best_complete_move):
+        try:
+            deduce(board, Side.WHITES, 0)
+            assert False
+        except ValueError as e:
+            assert str(e) == "max_depth must be at least 1"
+        try:
+            deduce(board, Side.WHITES, 256)
+            assert False
+        except ValueError as e:
+            assert str(e) == "max_depth must be at most 255"
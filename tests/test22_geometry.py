@@ -0,0 +1,22 @@
+from checkersanalyser.bitboard import shift, DIRECTIONS
+from checkersanalyser.geometry import NEIGHBOURS, RAYS, JUMPS, SQUARE_NEIGHBOURS, SQUARE_RAYS, SQUARE_JUMPS, \
+    square, coords
+
+
+def test():
+    assert NEIGHBOURS[0][0] == (None, None, None, (1, 1))
+    assert NEIGHBOURS[4][2] == ((3, 1), (3, 3), (5, 1), (5, 3))
+    assert RAYS[2][4][1] == ((1, 5), (0, 6))
+    assert RAYS[5][3][2] == ((6, 2), (7, 1))
+    assert JUMPS[4][2] == (((3, 1), (2, 0)), ((3, 3), (2, 4)), ((5, 1), (6, 0)), ((5, 3), (6, 4)))
+    assert JUMPS[1][1][0] is None
+
+    for sq in range(32):
+        assert square(coords(sq)) == sq
+        for d in DIRECTIONS:
+            n = SQUARE_NEIGHBOURS[d][sq]
+            assert shift(1 << sq, d) == (0 if n < 0 else 1 << n)
+            i, j = coords(sq)
+            assert [coords(s) for s in SQUARE_RAYS[d][sq]] == list(RAYS[i][j][d])
+            jump = SQUARE_JUMPS[d][sq]
+            assert (None if jump is None else (coords(jump[0]), coords(jump[1]))) == JUMPS[i][j][d]
@@ -0,0 +1,31 @@
+from checkersanalyser.bitboard import from_board, to_board, generate_moves, apply_move
+from checkersanalyser.common import Side
+
+
+def test():
+    board = [
+        [0, 0, 0, 0, 0, 0, 0, 0],  # 0
+        [0, 3, 0, 0, 0, 0, 0, 0],  # 1
+        [0, 0, 0, 0, 3, 0, 0, 0],  # 2
+        [0, 3, 0, 0, 0, 0, 0, 0],  # 3
+        [0, 0, 1, 0, 0, 0, 0, 0],  # 4
+        [0, 0, 0, 3, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0, 0]
+    ]
+
+    pos = from_board(board)
+    assert pos.counts == (1, 0, 4, 0)
+    assert pos.score(Side.WHITES) == -3
+    assert pos.winning_side() is None
+
+    moves = generate_moves(pos, Side.WHITES)
+    print(moves)
+    best = max(moves, key=lambda m: len(m.path))
+    assert repr(best) == "{(4, 2) -> (2, 0) -> (0, 2) -> (3, 5) -> (6, 2)}"
+    after = apply_move(pos, Side.WHITES, best)
+    assert after.counts == (0, 1, 0, 0)
+    assert after.counts == from_board(to_board(after)).counts
+    assert after.score(Side.BLACKES) == -1
+    assert after.winning_side() == Side.WHITES
+    assert pos.counts == (1, 0, 4, 0)
@@ -0,0 +1,30 @@
+from concurrent.futures import ProcessPoolExecutor
+
+from checkersanalyser.bitboard import from_board
+from checkersanalyser.common import Side
+from checkersanalyser.parallel import search_parallel
+from checkersanalyser.search import Searcher
+from checkersanalyser.ttable import TranspositionTable
+
+
+def test():
+    board = [
+        [0, 0, 0, 0, 0, 0, 0, 0],  # 0
+        [0, 3, 0, 3, 0, 3, 0, 0],  # 1
+        [0, 0, 3, 0, 0, 0, 3, 0],  # 2
+        [0, 3, 0, 0, 0, 0, 0, 0],  # 3
+        [0, 0, 1, 0, 1, 0, 0, 0],  # 4
+        [0, 1, 0, 0, 0, 3, 0, 1],
+        [1, 0, 1, 0, 0, 0, 1, 0],
+        [0, 0, 0, 0, 0, 1, 0, 0]
+    ]
+
+    pos = from_board(board)
+    with ProcessPoolExecutor(2) as executor:
+        for side in (Side.WHITES, Side.BLACKES):
+            for depth in (1, 3, 5):
+                serial = Searcher(depth, TranspositionTable(1 << 16)).search(pos, side)
+                parallel = search_parallel(pos, side, depth, executor)
+                print(side, depth, serial, parallel)
+                assert parallel.move == serial.move
+                assert parallel.score == serial.score
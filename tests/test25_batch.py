@@ -0,0 +1,41 @@
+import io
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from checkersanalyser.batch import run_batch
+
+
+def test():
+    board = [
+        [0, 0, 0, 0, 0, 0, 0, 0],  # 0
+        [0, 3, 0, 0, 0, 0, 0, 0],  # 1
+        [0, 0, 0, 0, 3, 0, 0, 0],  # 2
+        [0, 3, 0, 0, 0, 0, 0, 0],  # 3
+        [0, 0, 1, 0, 0, 0, 0, 0],  # 4
+        [0, 0, 0, 3, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0, 0]
+    ]
+
+    lines = [json.dumps({"id": i, "board": board, "side": "whites", "depth": 1 + i % 5}) for i in range(20)]
+    lines.insert(3, "")
+    lines.append('{"board": [], "side": "purple"}')
+
+    out = io.StringIO()
+    assert run_batch(lines, out) == 21
+    serial = [json.loads(line) for line in out.getvalue().splitlines()]
+    print(serial)
+    assert serial[0]["move"] == [[4, 2], [2, 0], [0, 2], [3, 5], [6, 2]]
+    assert [r["line"] for r in serial] == [i for i in range(1, 23) if i != 4]
+    assert "error" in serial[-1]
+
+    out = io.StringIO()
+    with ThreadPoolExecutor(3) as executor:
+        assert run_batch(lines, out, workers=3, ordered=True, max_pending=2, executor=executor) == 21
+    assert [json.loads(line) for line in out.getvalue().splitlines()] == serial
+
+    out = io.StringIO()
+    with ThreadPoolExecutor(3) as executor:
+        run_batch(iter(lines), out, workers=3, max_pending=4, executor=executor)
+    unordered = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert sorted(unordered, key=lambda r: r["line"]) == serial
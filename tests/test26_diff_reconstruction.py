@@ -0,0 +1,45 @@
+from moveanalyser import MoveAnalyser, Side
+
+
+def test():
+    fromm = [
+        [0, 0, 0, 0, 0, 0, 0, 0],  # 0
+        [0, 0, 0, 3, 0, 3, 0, 0],  # 1
+        [0, 0, 1, 0, 0, 0, 0, 0],  # 2
+        [0, 0, 0, 3, 0, 3, 0, 0],  # 3
+        [0, 0, 0, 0, 0, 0, 0, 0],  # 4
+        [0, 3, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0, 0]
+    ]
+
+    around = [
+        [0, 0, 0, 0, 0, 0, 0, 0],  # 0
+        [0, 0, 0, 0, 0, 0, 0, 0],  # 1
+        [0, 0, 1, 0, 0, 0, 0, 0],  # 2
+        [0, 0, 0, 0, 0, 0, 0, 0],  # 3
+        [0, 0, 0, 0, 0, 0, 0, 0],  # 4
+        [0, 3, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0, 0]
+    ]
+
+    res = MoveAnalyser(fromm, around).calculate_move_for_side(Side.WHITES)
+    assert repr(res) == "[{(2, 2) -> (0, 4) -> (2, 6) -> (4, 4) -> (2, 2)}, {(2, 2) -> (4, 4) -> (2, 6) -> (0, 4) -> (2, 2)}]"
+
+    halfway = [
+        [0, 0, 0, 0, 0, 0, 0, 0],  # 0
+        [0, 0, 0, 3, 0, 3, 0, 0],  # 1
+        [0, 0, 0, 0, 0, 0, 1, 0],  # 2
+        [0, 0, 0, 0, 0, 0, 0, 0],  # 3
+        [0, 0, 0, 0, 0, 0, 0, 0],  # 4
+        [0, 3, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0, 0]
+    ]
+
+    res = MoveAnalyser(fromm, halfway).calculate_move_for_side(Side.WHITES)
+    assert repr(res) == "[{(2, 2) -> (4, 4) -> (2, 6)}]"
+
+    assert MoveAnalyser(fromm, fromm).calculate_move_for_side(Side.WHITES) == []
+    assert MoveAnalyser(fromm, halfway).calculate_move_for_side(Side.BLACKES) == []
@@ -0,0 +1,59 @@
+import contextlib
+import io
+import logging
+
+from checkersanalyser import tracing
+from checkersanalyser.common import Side
+from checkersanalyser.moveanalyser import MoveAnalyser
+
+
+def test():
+    fromm = [
+        [3, 0, 3, 0, 3, 0, 3, 0],  # 0
+        [0, 3, 0, 3, 0, 3, 0, 3],  # 1
+        [3, 0, 3, 0, 3, 0, 3, 0],  # 2
+        [0, 0, 0, 0, 0, 0, 0, 0],  # 3
+        [0, 0, 0, 0, 0, 0, 0, 0],  # 4
+        [0, 1, 0, 1, 0, 1, 0, 1],  # 5
+        [1, 0, 1, 0, 1, 0, 1, 0],
+        [0, 1, 0, 1, 0, 1, 0, 1]
+    ]
+
+    to = [
+        [3, 0, 3, 0, 3, 0, 3, 0],  # 0
+        [0, 3, 0, 3, 0, 3, 0, 3],  # 1
+        [3, 0, 3, 0, 3, 0, 3, 0],  # 2
+        [0, 0, 0, 0, 0, 0, 0, 0],  # 3
+        [0, 0, 1, 0, 0, 0, 0, 0],  # 4
+        [0, 0, 0, 1, 0, 1, 0, 1],  # 5
+        [1, 0, 1, 0, 1, 0, 1, 0],
+        [0, 1, 0, 1, 0, 1, 0, 1]
+    ]
+
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        res = MoveAnalyser(fromm, to).calculate_move_for_side(Side.WHITES)
+    assert repr(res) == "[{(5, 1) -> (4, 2)}]"
+    assert out.getvalue() == ""
+
+    events = []
+    res = MoveAnalyser(fromm, to, tracer=events.append).calculate_move_for_side(Side.WHITES)
+    assert len(events) == 1
+    assert events[0]["event"] == "calculate_move_for_side"
+    assert events[0]["side"] == "Whites"
+    assert events[0]["from"] == fromm and events[0]["to"] == to
+    assert events[0]["candidates"] == 2
+    assert events[0]["matched"] == [[(5, 1), (4, 2)]]
+    assert events[0]["elapsed_ms"] >= 0
+
+    logger = logging.getLogger("checkersanalyser.test27")
+    logger.setLevel(logging.DEBUG)
+    stream = io.StringIO()
+    logger.addHandler(logging.StreamHandler(stream))
+    previous = tracing.set_tracer(tracing.logging_tracer(logger))
+    try:
+        MoveAnalyser(fromm, to).calculate_move_for_side(Side.WHITES)
+    finally:
+        tracing.set_tracer(previous)
+    assert "calculate_move_for_side" in stream.getvalue()
+    assert tracing.tracer is previous
@@ -0,0 +1,32 @@
+from pyrsistent import freeze
+
+from checkersanalyser.common import Side, Move, Piece
+from checkersanalyser.movemaker import _get_complete_player_moves
+
+
+def test():
+    board = [
+        [0, 0, 0, 0, 0, 0, 0, 0],  # 0
+        [0, 0, 0, 3, 0, 3, 0, 0],  # 1
+        [0, 0, 1, 0, 0, 0, 0, 0],  # 2
+        [0, 0, 0, 3, 0, 3, 0, 0],  # 3
+        [0, 0, 0, 0, 0, 0, 0, 0],  # 4
+        [0, 0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0, 0]
+    ]
+
+    moves = _get_complete_player_moves(freeze(board), Side.WHITES)
+    print(moves)
+    assert repr(moves) == "[{(2, 2) -> (0, 4) -> (2, 6) -> (4, 4) -> (2, 2)}, " \
+                          "{(2, 2) -> (4, 4) -> (2, 6) -> (0, 4) -> (2, 2)}]"
+    assert moves[0].to_list() == [(2, 2), (0, 4), (2, 6), (4, 4), (2, 2)]
+
+    first_hops = [m.prev_move.prev_move.prev_move for m in moves]
+    assert first_hops[0].piece is first_hops[1].piece
+    assert not first_hops[0].piece.is_queen
+    assert moves[0].piece.is_queen and moves[1].piece.is_queen
+    assert first_hops[0].piece.pos == (2, 2)
+
+    assert not hasattr(Move((0, 0), (1, 1), False, None), "__dict__")
+    assert not hasattr(Piece(0, 0, Side.WHITES, False), "__dict__")
@@ -0,0 +1,59 @@
+from checkersanalyser import movecache
+from checkersanalyser.bitboard import from_board, generate_moves
+from checkersanalyser.common import Side
+from checkersanalyser.moveanalyser import MoveAnalyser
+from checkersanalyser.movemaker import deduce_best_min_max_move
+
+
+def test():
+    fromm = [
+        [3, 0, 3, 0, 3, 0, 3, 0],  # 0
+        [0, 3, 0, 3, 0, 3, 0, 3],  # 1
+        [3, 0, 3, 0, 3, 0, 3, 0],  # 2
+        [0, 0, 0, 0, 0, 0, 0, 0],  # 3
+        [0, 0, 0, 0, 0, 0, 0, 0],  # 4
+        [0, 1, 0, 1, 0, 1, 0, 1],  # 5
+        [1, 0, 1, 0, 1, 0, 1, 0],
+        [0, 1, 0, 1, 0, 1, 0, 1]
+    ]
+
+    to = [
+        [3, 0, 3, 0, 3, 0, 3, 0],  # 0
+        [0, 3, 0, 3, 0, 3, 0, 3],  # 1
+        [3, 0, 3, 0, 3, 0, 3, 0],  # 2
+        [0, 0, 0, 0, 0, 0, 0, 0],  # 3
+        [0, 0, 1, 0, 0, 0, 0, 0],  # 4
+        [0, 0, 0, 1, 0, 1, 0, 1],  # 5
+        [1, 0, 1, 0, 1, 0, 1, 0],
+        [0, 1, 0, 1, 0, 1, 0, 1]
+    ]
+
+    cache = movecache.MoveCache(2)
+    pos, next_pos = from_board(fromm), from_board(to)
+    assert cache.moves(pos, Side.WHITES) == tuple(generate_moves(pos, Side.WHITES))
+    assert cache.moves(pos, Side.WHITES) is cache.moves(pos, Side.WHITES)
+    assert (cache.hits, cache.misses) == (2, 1)
+    cache.moves(next_pos, Side.BLACKES)
+    cache.moves(pos, Side.WHITES)
+    cache.moves(pos, Side.BLACKES)
+    assert len(cache) == 2
+    assert (pos, Side.WHITES) in cache.entries and (next_pos, Side.BLACKES) not in cache.entries
+    cache.clear()
+    assert len(cache) == 0 and cache.hits == cache.misses == 0
+
+    previous = movecache._default_cache
+    try:
+        shared = movecache.set_default_cache_size(1000)
+        res = MoveAnalyser(fromm, to).calculate_move_for_side(Side.WHITES)
+        print(res)
+        assert repr(res) == "[{(5, 1) -> (4, 2)}]"
+        assert (shared.hits, shared.misses) == (0, 1)
+        MoveAnalyser(fromm, to).calculate_move_for_side(Side.WHITES)
+        assert shared.hits == 1
+
+        deduce_best_min_max_move(to, Side.BLACKES, 3)
+        misses = shared.misses
+        deduce_best_min_max_move(to, Side.BLACKES, 3)
+        assert shared.misses == misses
+    finally:
+        movecache._default_cache = previous
@@ -0,0 +1,54 @@
+import tracemalloc
+
+from pyrsistent import freeze
+
+from checkersanalyser.bitboard import from_board, apply_move
+from checkersanalyser.common import Side
+from checkersanalyser.movemaker import iter_leaves, simulate_game, _get_tree_leaves, calculate_board_score
+from checkersanalyser.search import Searcher
+from checkersanalyser.ttable import TranspositionTable
+
+
+def test():
+    board = freeze([
+        [3, 0, 3, 0, 3, 0, 3, 0],  # 0
+        [0, 3, 0, 3, 0, 3, 0, 3],  # 1
+        [3, 0, 3, 0, 3, 0, 3, 0],  # 2
+        [0, 0, 0, 0, 0, 0, 0, 0],  # 3
+        [0, 0, 0, 0, 0, 0, 0, 0],  # 4
+        [0, 1, 0, 1, 0, 1, 0, 1],  # 5
+        [1, 0, 1, 0, 1, 0, 1, 0],
+        [0, 1, 0, 1, 0, 1, 0, 1]
+    ])
+
+    leaves = iter_leaves(board, Side.WHITES, 3)
+    first = next(leaves)
+    print(repr(first))
+    assert repr(first) == "{(5, 1) -> (4, 0) -> (3, 1) -> (4, 2)}"
+    assert first.prev_move.prev_move.prev_move is None and first.prev_move.children is None
+    expected = simulate_game(board, Side.WHITES, max_depth=3)
+    assert [repr(first)] + [repr(m) for m in leaves] == [repr(m) for m in expected]
+    assert [m.board for m in iter_leaves(board, Side.WHITES, 3)] == [m.board for m in expected]
+    assert [score for _, score in _get_tree_leaves(board, Side.WHITES, 3)] == \
+        [calculate_board_score(m.board, Side.WHITES) for m in expected]
+
+    # Fill the move cache first so that only the walks themselves are measured.
+    count = sum(1 for _ in iter_leaves(board, Side.WHITES, 4))
+    tracemalloc.start()
+    assert sum(1 for _ in iter_leaves(board, Side.WHITES, 4)) == count
+    lazy_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    tracemalloc.start()
+    assert len(simulate_game(board, Side.WHITES, max_depth=4)) == count == 1469
+    list_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    assert lazy_peak * 20 < list_peak
+
+    pos = from_board(board)
+    res = Searcher(5, table=TranspositionTable(1 << 20)).search(pos, Side.WHITES)
+    assert res.pv[0] == res.move and len(res.pv) == res.depth == 5
+    side = Side.WHITES
+    for m in res.pv:
+        pos = apply_move(pos, side, m)
+        side = side.opposite_side()
+    assert pos.score(Side.WHITES) == res.score
@@ -0,0 +1,57 @@
+from checkersanalyser import evaluate
+from checkersanalyser.bitboard import from_board, generate_moves, apply_move
+from checkersanalyser.common import Side
+from checkersanalyser.evaluate import Weights, MATERIAL
+from checkersanalyser.movemaker import deduce_best_min_max_move
+from checkersanalyser.search import Searcher
+
+
+def test():
+    board = [
+        [0, 0, 3, 0, 0, 0, 0, 0],  # 0
+        [0, 0, 0, 0, 0, 0, 0, 0],  # 1
+        [0, 0, 0, 0, 0, 0, 0, 0],  # 2
+        [0, 0, 0, 3, 0, 0, 0, 0],  # 3
+        [0, 0, 0, 0, 0, 0, 0, 0],  # 4
+        [0, 0, 0, 0, 0, 0, 0, 0],  # 5
+        [1, 0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0, 2]
+    ]
+
+    weights = Weights(man=3, king=5, advancement=1, back_rank=2)
+    pos = from_board(board)
+    # blacks: 3 + 2 for the man guarding row 0, 3 + 3 for the one on row 3; whites: 3 + 1 and a king
+    assert evaluate.evaluate(pos, Side.BLACKES, weights) == 11 - 9
+    assert evaluate.evaluate(pos, Side.WHITES) == pos.score(Side.WHITES) == 0
+
+    children = [apply_move(pos, Side.BLACKES, m) for m in generate_moves(pos, Side.BLACKES)] * 20
+    expected = [evaluate.evaluate(c, Side.WHITES, weights) for c in children]
+    print(expected[:3])
+    assert expected[:3] == [-1, -1, -3]
+    assert evaluate.evaluate_positions(children, Side.WHITES, weights) == expected
+    assert evaluate.evaluate_positions(children, Side.WHITES) == [c.score(Side.WHITES) for c in children]
+    if evaluate.np is not None:
+        boards = evaluate.np.array([board, board])
+        assert evaluate.evaluate_boards(boards, Side.WHITES, weights).tolist() == [-2, -2]
+        bitboards = evaluate.np.array([pos.as_tuple()], dtype=evaluate.np.uint64)
+        assert evaluate.evaluate_bitboards(bitboards, Side.BLACKES, MATERIAL).tolist() == [0]
+        numpy, evaluate.np = evaluate.np, None
+        try:
+            assert evaluate.evaluate_positions(children, Side.WHITES, weights) == expected
+        finally:
+            evaluate.np = numpy
+
+    # Material alone sees nothing to choose and takes the first move; the weighted search keeps the
+    # back rank guarded and advances the front man.
+    assert repr(deduce_best_min_max_move(board, Side.BLACKES, 1)) == "{(0, 2) -> (1, 1)}"
+    assert repr(deduce_best_min_max_move(board, Side.BLACKES, 1, weights=weights)) == "{(3, 3) -> (4, 2)}"
+    assert repr(deduce_best_min_max_move(board, Side.BLACKES, 1, weights=Weights(back_rank=1))) == \
+        "{(3, 3) -> (4, 2)}"
+
+    res = Searcher(4, weights=weights).search(pos, Side.BLACKES)
+    assert res.score == Searcher(4, weights=weights).search(pos, Side.BLACKES).score
+    try:
+        Searcher(4, weights=Weights(man=100))
+        assert False
+    except ValueError:
+        pass
@@ -0,0 +1,104 @@
+import itertools
+import os
+import tempfile
+
+from checkersanalyser import tablebase
+from checkersanalyser.bitboard import from_board, apply_move, generate_moves
+from checkersanalyser.common import Side
+from checkersanalyser.search import Searcher
+from checkersanalyser.ttable import TranspositionTable
+
+
+def test():
+    board = [
+        [0, 0, 0, 0, 0, 0, 3, 0],  # 0
+        [0, 0, 0, 0, 0, 0, 0, 0],  # 1
+        [0, 0, 0, 0, 0, 0, 0, 0],  # 2
+        [0, 0, 0, 0, 0, 0, 0, 0],  # 3
+        [1, 0, 0, 0, 0, 0, 0, 0],  # 4
+        [0, 0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0, 0]
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "tb2.bin")
+        tablebase.build(path, 2)
+        assert os.path.getsize(path) == tablebase.HEADER_BYTES + 32 * 31 // 2 * 16
+
+        tb = tablebase.Tablebase(path)
+        assert tb.data is None
+        pos = from_board(board)
+        assert tb.probe(pos, Side.WHITES) == (tablebase.WIN, 13)
+        assert tb.max_pieces == 2 and tb.probes == 1
+        assert tb.score(pos, Side.WHITES) == tablebase.WIN_SCORE - 13
+
+        # Every position agrees with the positions its moves lead to.
+        for p, side in itertools.product(tablebase._positions(2), Side):
+            if p is None:
+                continue
+            result, distance = tb.probe(p, side)
+            children = [tb.probe(apply_move(p, side, m), side.opposite_side()) for m in generate_moves(p, side)]
+            losses = [d for r, d in children if r == tablebase.LOSS]
+            if losses:
+                assert (result, distance) == (tablebase.WIN, min(losses) + 1)
+            elif all(r == tablebase.WIN for r, d in children):
+                assert (result, distance) == (tablebase.LOSS, max([-1] + [d for r, d in children]) + 1)
+            else:
+                assert result == tablebase.DRAW
+
+        # Both sides playing from the tablebase, the win takes exactly the 13 plies it promises.
+        side, plies = Side.WHITES, 0
+        while pos.winning_side() is None and generate_moves(pos, side):
+            res = Searcher(5, table=TranspositionTable(1 << 16), tablebase=tb).search(pos, side)
+            assert res.depth == 1
+            pos = apply_move(pos, side, res.move)
+            side = side.opposite_side()
+            plies += 1
+        print(plies, pos)
+        assert plies == 13 and side == Side.BLACKES
+
+        # A side without a move has lost in the tablebase, while the search alone counts material.
+        blocked = [[0] * 8 for _ in range(8)]
+        blocked[0][6], blocked[1][7] = 3, 1
+        blocked = from_board(blocked)
+        assert tb.probe(blocked, Side.WHITES) == (tablebase.LOSS, 0)
+        assert Searcher(3, table=TranspositionTable(1 << 16), tablebase=tb).search(blocked, Side.WHITES).score == \
+            -tablebase.WIN_SCORE
+        assert Searcher(3, table=TranspositionTable(1 << 16)).search(blocked, Side.WHITES)[:3] == (None, 0, 0)
+
+        # Two tablebases searching through one table keep to their own entries.
+        path3 = os.path.join(tmp, "tb3.bin")
+        tablebase.build(path3, 3)
+        tb3 = tablebase.Tablebase(path3)
+        four = from_board([
+            [0, 0, 0, 0, 3, 0, 0, 0],  # 0
+            [0, 0, 0, 0, 0, 0, 0, 0],  # 1
+            [0, 0, 0, 0, 1, 0, 0, 0],  # 2
+            [0, 0, 0, 0, 0, 0, 0, 0],  # 3
+            [0, 0, 0, 0, 0, 0, 0, 0],  # 4
+            [0, 0, 0, 0, 0, 1, 0, 0],
+            [3, 0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0, 0]
+        ])
+        fresh = Searcher(6, table=TranspositionTable(1 << 16), tablebase=tb3).search(four, Side.WHITES)
+        shared = TranspositionTable(1 << 16)
+        Searcher(6, table=shared, tablebase=tb).search(four, Side.WHITES)
+        res = Searcher(6, table=shared, tablebase=tb3).search(four, Side.WHITES)
+        print(fresh, res)
+        assert (res.move, res.score) == (fresh.move, fresh.score) and fresh.score < -tablebase.WIN_SCORE // 2
+        assert tb3.identity() == (path3, 3) and tb.identity() == (path, 2)
+        tb3.close()
+
+        previous = os.environ.get("CHECKERSANALYSER_TABLEBASE")
+        os.environ["CHECKERSANALYSER_TABLEBASE"] = path
+        try:
+            assert Searcher(5).tablebase.path == path
+        finally:
+            if previous is None:
+                del os.environ["CHECKERSANALYSER_TABLEBASE"]
+            else:
+                os.environ["CHECKERSANALYSER_TABLEBASE"] = previous
+        if previous is None:
+            assert Searcher(5).tablebase is None
+        tb.close()
@@ -0,0 +1,49 @@
+from checkersanalyser.bitboard import BitMove, from_board
+from checkersanalyser.common import Side
+from checkersanalyser.ordering import MoveOrdering, HeuristicOrdering
+from checkersanalyser.search import Searcher
+from checkersanalyser.ttable import TranspositionTable
+
+
+def test():
+    quiet = BitMove((21, 17), 0, False)
+    other_quiet = BitMove((22, 18), 0, False)
+    promotion = BitMove((5, 1), 0, True)
+    capture = BitMove((18, 9), 1 << 13, False)
+    double_capture = BitMove((18, 9, 2), 1 << 13 | 1 << 6, False)
+    moves = (quiet, other_quiet, promotion, capture, double_capture)
+
+    ordering = HeuristicOrdering()
+    assert ordering.order(moves, Side.WHITES, None, 1, 3) == [4, 3, 2, 0, 1]
+    assert ordering.order(moves, Side.WHITES, 1, 1, 3) == [1, 4, 3, 2, 0]
+    assert ordering.order(moves, Side.WHITES, 1, 1, 1) == [1, 0, 2, 3, 4]
+    ordering.cutoff(moves, Side.WHITES, 1, 2, 3)
+    assert ordering.order(moves, Side.WHITES, None, 2, 3) == [4, 3, 2, 1, 0]
+    ordering.new_search()
+    # The killer is gone with the search; the history, halved, still ranks the move.
+    assert ordering.killers == [] and ordering.history[0][22 << 5 | 18] == 4
+    assert ordering.order(moves, Side.WHITES, None, 2, 3) == [4, 3, 2, 1, 0]
+    assert ordering.order(moves, Side.BLACKES, None, 2, 3) == [4, 3, 2, 0, 1]
+    assert MoveOrdering().order(moves, Side.WHITES, 2, 1, 3) == [2, 0, 1, 3, 4]
+
+    board = [
+        [3, 0, 3, 0, 3, 0, 3, 0],  # 0
+        [0, 3, 0, 0, 0, 3, 0, 3],  # 1
+        [3, 0, 3, 0, 0, 0, 3, 0],  # 2
+        [0, 0, 0, 3, 0, 3, 0, 0],  # 3
+        [0, 0, 1, 0, 0, 0, 0, 0],  # 4
+        [0, 1, 0, 0, 0, 1, 0, 1],  # 5
+        [1, 0, 1, 0, 1, 0, 1, 0],
+        [0, 1, 0, 1, 0, 1, 0, 1]
+    ]
+
+    pos = from_board(board)
+    plain = Searcher(8, TranspositionTable(1 << 20), ordering=MoveOrdering())
+    heuristic = Searcher(8, TranspositionTable(1 << 20))
+    expected, res = plain.search(pos, Side.WHITES), heuristic.search(pos, Side.WHITES)
+    print(res, plain.first_move_cutoff_rate(), heuristic.first_move_cutoff_rate())
+    assert (res.move, res.score) == (expected.move, expected.score)
+    assert res.nodes < expected.nodes
+    assert heuristic.cutoffs > 0 and 0 < heuristic.first_move_cutoffs <= heuristic.cutoffs
+    assert heuristic.first_move_cutoff_rate() == heuristic.first_move_cutoffs / heuristic.cutoffs
+    assert Searcher(3).first_move_cutoff_rate() is None
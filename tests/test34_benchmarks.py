@@ -0,0 +1,66 @@
+import contextlib
+import copy
+import io
+import json
+import math
+import os
+import tempfile
+
+from checkersanalyser import bench
+from checkersanalyser.__main__ import main
+from checkersanalyser.resultcache import default_result_cache
+
+
+def test():
+    report = bench.run_benchmarks(depth=2, repeat=1, positions=["capture-chain", "endgame"])
+    print(report)
+    assert report["depth"] == 2 and report["version"] == bench.BENCH_VERSION
+    assert report["disabled"] == {"result_cache": False, "tablebase": False}
+    assert sorted(report["results"]) == sorted(f"{b}/{p}" for b in bench.BENCHMARKS for p in ("capture-chain", "endgame"))
+    res = report["results"]["min_max/capture-chain"]
+    assert res["wall_ms"] > 0 and res["peak_kib"] > 0 and res["nodes"] > 0
+    assert math.isclose(res["nodes_per_sec"], res["nodes"] / (res["wall_ms"] / 1000))
+    assert report["results"]["complete_move/endgame"]["nodes"] is None
+    assert report["results"]["analyse/endgame"]["nodes"] == len(bench.generate_moves(
+        bench.from_board(bench.POSITIONS["endgame"][0]), bench.POSITIONS["endgame"][1]))
+    assert report["results"]["generate/endgame"]["nodes"] == bench.GENERATION_ROUNDS
+
+    assert bench.compare(report, report) == []
+    baseline = copy.deepcopy(report)
+    baseline["results"]["analyse/endgame"]["wall_ms"] /= 2
+    del baseline["results"]["generate/endgame"]
+    regressions = bench.compare(report, baseline, 0.5)
+    assert [(r["name"], r["metric"]) for r in regressions] == [("analyse/endgame", "wall_ms")]
+    assert regressions[0]["ratio"] == 2
+    assert bench.compare(report, baseline, 1.5) == []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "baseline.json")
+        baseline["results"] = {name: dict(res, wall_ms=res["wall_ms"] / 1000) for name, res in report["results"].items()}
+        bench.save(baseline, path)
+        assert bench.load(path) == json.loads(json.dumps(baseline))
+        err = io.StringIO()
+        with contextlib.redirect_stderr(err):
+            try:
+                main(["bench", "-o", os.path.join(tmp, "current.json"), "-d", "2", "-r", "1",
+                      "--position", "endgame", "--benchmark", "generate", "--compare", path])
+                assert False
+            except SystemExit as e:
+                assert e.code == 1
+        assert "generate/endgame: wall_ms" in err.getvalue()
+        assert list(bench.load(os.path.join(tmp, "current.json"))["results"]) == ["generate/endgame"]
+
+        # Repeats are searched, not read back from a result cache the environment turns on.
+        previous = os.environ.get("CHECKERSANALYSER_RESULT_CACHE")
+        os.environ["CHECKERSANALYSER_RESULT_CACHE"] = os.path.join(tmp, "results.sqlite")
+        try:
+            report = bench.run_benchmarks(depth=2, repeat=2, positions=["endgame"], benchmarks=["min_max"])
+            assert report["disabled"] == {"result_cache": True, "tablebase": False}
+            cache = default_result_cache()
+            assert cache.hits == 0 and len(cache) == 0
+            cache.close()
+        finally:
+            if previous is None:
+                del os.environ["CHECKERSANALYSER_RESULT_CACHE"]
+            else:
+                os.environ["CHECKERSANALYSER_RESULT_CACHE"] = previous
@@ -0,0 +1,47 @@
+import contextlib
+import io
+
+from checkersanalyser.__main__ import main
+from checkersanalyser.common import Side
+from checkersanalyser.perft import perft, perft_divide, perft_report, check_generators
+
+
+def test():
+    opening = [
+        [3, 0, 3, 0, 3, 0, 3, 0],  # 0
+        [0, 3, 0, 3, 0, 3, 0, 3],  # 1
+        [3, 0, 3, 0, 3, 0, 3, 0],  # 2
+        [0, 0, 0, 0, 0, 0, 0, 0],  # 3
+        [0, 0, 0, 0, 0, 0, 0, 0],  # 4
+        [0, 1, 0, 1, 0, 1, 0, 1],  # 5
+        [1, 0, 1, 0, 1, 0, 1, 0],
+        [0, 1, 0, 1, 0, 1, 0, 1]
+    ]
+
+    captures = [
+        [0, 0, 0, 0, 0, 0, 0, 0],  # 0
+        [0, 0, 0, 3, 0, 3, 0, 0],  # 1
+        [0, 0, 1, 0, 0, 0, 0, 0],  # 2
+        [0, 0, 0, 3, 0, 3, 0, 0],  # 3
+        [0, 0, 0, 0, 0, 0, 0, 0],  # 4
+        [0, 3, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0, 0]
+    ]
+
+    assert [perft(opening, Side.WHITES, d) for d in range(5)] == [1, 7, 49, 302, 1469]
+    assert perft(opening, Side.WHITES, 3, "board") == 302
+    divide = perft_divide(opening, Side.WHITES, 4)
+    print(divide)
+    assert divide["{(5, 1) -> (4, 0)}"] == 264 and sum(divide.values()) == 1469
+    assert perft_divide(captures, Side.WHITES, 1) == {"{(2, 2) -> (0, 4) -> (2, 6) -> (4, 4) -> (2, 2)}": 1,
+                                                      "{(2, 2) -> (4, 4) -> (2, 6) -> (0, 4) -> (2, 2)}": 1}
+    assert perft(captures, Side.WHITES, 3) == perft(captures, Side.WHITES, 3, "board")
+    assert check_generators(captures, Side.WHITES, 4) == {}
+    assert check_generators(opening, Side.BLACKES, 3) == {}
+    assert [r["nodes"] for r in perft_report(opening, Side.WHITES, 3)] == [7, 49, 302]
+
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        main(["perft", "-d", "2", "--divide", "--check"])
+    assert "depth 2: 49 nodes" in out.getvalue() and "{(5, 7) -> (4, 6)}: 7" in out.getvalue()
@@ -0,0 +1,149 @@
+import asyncio
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from checkersanalyser.server import AnalysisServer
+
+
+class GatedExecutor(ThreadPoolExecutor):
+    # Holds every job until the gate opens, so requests pile up deterministically.
+    def __init__(self, workers):
+        super().__init__(workers)
+        self.gate = threading.Event()
+
+    def submit(self, fn, *args, **kwargs):
+        return super().submit(self._run, fn, *args)
+
+    def _run(self, fn, *args):
+        self.gate.wait()
+        return fn(*args)
+
+
+class StepExecutor(ThreadPoolExecutor):
+    # Lets the jobs through one release at a time and records what they were called with.
+    def __init__(self, workers):
+        super().__init__(workers)
+        self.steps = threading.Semaphore(0)
+        self.calls = []
+
+    def submit(self, fn, *args, **kwargs):
+        self.calls.append(args)
+        return super().submit(self._run, fn, *args)
+
+    def _run(self, fn, *args):
+        self.steps.acquire()
+        return fn(*args)
+
+
+async def request(port, method, path, body=None):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    data = b"" if body is None else json.dumps(body).encode()
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(data)}\r\n\r\n".encode() + data)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, payload = response.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(payload)
+
+
+def test():
+    board = [
+        [0, 0, 0, 0, 0, 0, 0, 0],  # 0
+        [0, 3, 0, 0, 0, 0, 0, 0],  # 1
+        [0, 0, 0, 0, 3, 0, 0, 0],  # 2
+        [0, 3, 0, 0, 0, 0, 0, 0],  # 3
+        [0, 0, 1, 0, 0, 0, 0, 0],  # 4
+        [0, 0, 0, 3, 0, 0, 0, 0],  # 5
+        [0, 0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0, 0]
+    ]
+
+    after = [
+        [0, 0, 0, 0, 0, 0, 0, 0],  # 0
+        [0, 0, 0, 0, 0, 0, 0, 0],  # 1
+        [0, 0, 0, 0, 0, 0, 0, 0],  # 2
+        [0, 0, 0, 0, 0, 0, 0, 0],  # 3
+        [0, 0, 0, 0, 0, 0, 0, 0],  # 4
+        [0, 0, 0, 0, 0, 0, 0, 0],  # 5
+        [0, 0, 2, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0, 0]
+    ]
+
+    async def run():
+        executor = GatedExecutor(1)
+        server = AnalysisServer(max_queue=2, deadline_ms=5000, executor=executor)
+        await server.start(port=0)
+        try:
+            best = {"board": board, "side": "whites", "depth": 2}
+            waiting = [asyncio.create_task(request(server.port, "POST", "/best-move", best)) for _ in range(4)]
+            await asyncio.sleep(0.1)
+            # One computation runs, behind the gate, and the identical requests wait on it.
+            assert server.counters["coalesced"] == 3 and server.running == 1
+            other = asyncio.create_task(request(server.port, "POST", "/best-move", dict(best, depth=1)))
+            third = asyncio.create_task(request(server.port, "POST", "/best-move", dict(best, depth=3)))
+            await asyncio.sleep(0.1)
+            assert server.queue.qsize() == 2
+            assert (await request(server.port, "POST", "/best-move", dict(best, depth=4)))[0] == 503
+            # A deadline ends the wait, not the shared computation.
+            assert (await request(server.port, "POST", "/best-move", dict(best, depth=1, deadline_ms=50)))[0] == 504
+            metrics = (await request(server.port, "GET", "/metrics"))[1]
+            print(metrics)
+            assert metrics["queue_depth"] == 2 and metrics["rejected"] == 1 and metrics["timeouts"] == 1
+            assert len(server.latencies) == 2 and metrics["latency_ms"]["p99"] >= 50
+
+            executor.gate.set()
+            results = await asyncio.gather(*waiting, other, third)
+            assert [status for status, _ in results] == [200] * 6
+            assert len({json.dumps(res) for _, res in results[:4]}) == 1
+            print(results[0][1])
+            assert results[0][1]["move"] == [[4, 2], [2, 0], [0, 2], [3, 5], [6, 2]]
+
+            status, res = await request(server.port, "POST", "/analyse", {"from": board, "to": after, "side": "w"})
+            assert status == 200 and res == {"moves": [[[4, 2], [2, 0], [0, 2], [3, 5], [6, 2]]]}
+
+            assert (await request(server.port, "POST", "/best-move", {"board": [[0]], "side": "w"}))[0] == 400
+            assert (await request(server.port, "POST", "/best-move", {"board": board, "side": "red"}))[0] == 400
+            assert (await request(server.port, "GET", "/best-move"))[0] == 405
+            assert (await request(server.port, "GET", "/nowhere"))[0] == 404
+
+            metrics = (await request(server.port, "GET", "/metrics"))[1]
+            assert metrics["computations"] == 4 and metrics["queue_depth"] == 0
+            assert metrics["latency_ms"]["p50"] <= metrics["latency_ms"]["p99"]
+        finally:
+            executor.gate.set()
+            await server.close()
+            executor.shutdown()
+
+    async def resubmit():
+        executor = StepExecutor(1)
+        server = AnalysisServer(deadline_ms=5000, executor=executor)
+        await server.start(port=0)
+        try:
+            best = {"board": board, "side": "whites", "depth": 2}
+            # Every waiter of the running job times out; the search was given no more than that wait.
+            assert (await request(server.port, "POST", "/best-move", dict(best, deadline_ms=50)))[0] == 504
+            assert executor.calls[0][3] <= 50 and server.pending == {}
+            again = [asyncio.create_task(request(server.port, "POST", "/best-move", best)) for _ in range(2)]
+            await asyncio.sleep(0.1)
+            assert server.counters["coalesced"] == 1 and server.queue.qsize() == 1
+            # The abandoned job ends without dropping the new one, which identical requests still join.
+            executor.steps.release()
+            await asyncio.sleep(0.1)
+            assert server.running == 1 and len(server.pending) == 1
+            again.append(asyncio.create_task(request(server.port, "POST", "/best-move", best)))
+            await asyncio.sleep(0.1)
+            executor.steps.release()
+            results = await asyncio.gather(*again)
+            assert [status for status, _ in results] == [200] * 3
+            assert results[0][1]["move"] == [[4, 2], [2, 0], [0, 2], [3, 5], [6, 2]]
+            assert server.counters["computations"] == 2 and server.counters["coalesced"] == 2
+            assert 4000 < executor.calls[1][3] <= 5000 and server.pending == {} and server.expiries == {}
+        finally:
+            for _ in range(4):
+                executor.steps.release()
+            await server.close()
+            executor.shutdown()
+
+    asyncio.run(run())
+    asyncio.run(resubmit())
@@ -0,0 +1,75 @@
+import os
+import tempfile
+
+from checkersanalyser.bitboard import from_board
+from checkersanalyser.common import Side
+from checkersanalyser.movemaker import deduce_best_min_max_move, deduce_min_max_result, deduce_best_complete_move
+from checkersanalyser.resultcache import ResultCache, CachedResult, ENGINE_VERSION, default_result_cache, \
+    result_key, to_search_result
+from checkersanalyser.tablebase import default_tablebase
+
+
+def test():
+    board = [
+        [3, 0, 3, 0, 3, 0, 3, 0],  # 0
+        [0, 3, 0, 0, 0, 3, 0, 3],  # 1
+        [3, 0, 3, 0, 0, 0, 3, 0],  # 2
+        [0, 0, 0, 3, 0, 3, 0, 0],  # 3
+        [0, 0, 1, 0, 0, 0, 0, 0],  # 4
+        [0, 1, 0, 0, 0, 1, 0, 1],  # 5
+        [1, 0, 1, 0, 1, 0, 1, 0],
+        [0, 1, 0, 1, 0, 1, 0, 1]
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "results.sqlite")
+        uncached = deduce_min_max_result(board, Side.BLACKES, 3)
+        os.environ["CHECKERSANALYSER_RESULT_CACHE"] = path
+        try:
+            cache = default_result_cache()
+            expected = deduce_min_max_result(board, Side.BLACKES, 3)
+            assert expected[:3] == uncached[:3]
+            assert cache.misses == 1 and cache.hits == 0
+            # Answered from memory before the write lands, and from the file after.
+            assert deduce_min_max_result(board, Side.BLACKES, 3) == expected
+            cache.flush()
+            assert len(cache) == 1 and cache.unwritten == {}
+            move = deduce_best_min_max_move(board, Side.BLACKES, 3)
+            print(move)
+            assert move.to_list() == expected.move.to_list() and cache.hits == 2
+            # A finished search answers whatever budget the caller sets.
+            assert deduce_min_max_result(board, Side.BLACKES, 3, max_nodes=50) == expected
+            assert deduce_min_max_result(board, Side.BLACKES, 3, time_budget_ms=10000) == expected
+            assert cache.misses == 1 and cache.hits == 4
+            # A search its budget cut short is not stored; one that went the full depth is.
+            assert deduce_min_max_result(board, Side.BLACKES, 6, max_nodes=50).depth < 6
+            assert deduce_min_max_result(board, Side.BLACKES, 2, time_budget_ms=10000).depth == 2
+            assert len(cache) == 2 and cache.misses == 3
+
+            complete = deduce_best_complete_move(board, Side.WHITES, 2)
+            assert deduce_best_complete_move(board, Side.WHITES, 2).to_list() == complete.to_list()
+            assert cache.hits == 5 and len(cache) == 3
+            cache.close()
+            assert not cache.writer.is_alive()
+        finally:
+            del os.environ["CHECKERSANALYSER_RESULT_CACHE"]
+        assert default_result_cache() is None
+
+        tb = default_tablebase()
+        key = result_key(from_board(board), Side.BLACKES, "min_max", 3, (1, 1, 0, 0), tb and tb.identity())
+        cache = ResultCache(path)
+        assert cache.get(key).score == expected.score
+        assert to_search_result(cache.get(key), from_board(board), Side.BLACKES) == expected
+        # A stored move that is not legal in the position reads as a miss.
+        assert to_search_result(CachedResult((0, 4), 0, 3, 1), from_board(board), Side.BLACKES) is None
+        cache.close()
+
+        cache = ResultCache(path, max_entries=2, version=ENGINE_VERSION + 1)
+        assert len(cache) == 0
+        for i in range(3):
+            cache.put(f"k{i}", CachedResult(None, i, 1, 1))
+        cache.flush()
+        cache.get("k1")
+        cache.put("k3", CachedResult(None, 3, 1, 1))
+        assert len(cache) == 2 and cache.get("k2") is None and cache.get("k1").score == 1
+        cache.close()
@@ -0,0 +1,107 @@
+import os
+import tempfile
+
+from checkersanalyser.bitboard import from_board, to_board, generate_moves, apply_move
+from checkersanalyser.common import Side
+from checkersanalyser.movemaker import deduce_min_max_result, deduce_best_complete_move
+from checkersanalyser.resultcache import default_result_cache
+from checkersanalyser.symmetry import flip_board, flip_position, flip_move, canonical, canonical_key
+
+
+def test():
+    board = [
+        [3, 0, 3, 0, 3, 0, 3, 0],  # 0
+        [0, 3, 0, 0, 0, 3, 0, 3],  # 1
+        [3, 0, 3, 0, 0, 0, 3, 0],  # 2
+        [0, 0, 0, 3, 0, 4, 0, 0],  # 3
+        [0, 0, 1, 0, 0, 0, 0, 0],  # 4
+        [0, 1, 0, 0, 0, 2, 0, 1],  # 5
+        [1, 0, 1, 0, 1, 0, 1, 0],
+        [0, 1, 0, 1, 0, 1, 0, 1]
+    ]
+
+    flipped = flip_board(board)
+    print(flipped)
+    assert flipped[3] == [0, 0, 0, 0, 0, 3, 0, 0] and flipped[4] == [0, 0, 2, 0, 1, 0, 0, 0]
+    pos = from_board(board)
+    assert flip_position(pos) == from_board(flipped) and to_board(flip_position(pos)) == flipped
+    assert flip_position(flip_position(pos)) == pos and flip_position(pos).counts == from_board(flipped).counts
+    assert canonical(pos, Side.WHITES) == (pos, False)
+    assert canonical(from_board(flipped), Side.BLACKES) == (pos, True)
+    assert canonical_key(pos, Side.WHITES)[0] == canonical_key(from_board(flipped), Side.BLACKES)[0]
+
+    # The flipped position has the flipped moves, leading to the flipped positions.
+    for side in Side:
+        moves = generate_moves(pos, side)
+        twins = generate_moves(flip_position(pos), side.opposite_side())
+        assert sorted(flip_move(m) for m in moves) == sorted(twins)
+        for m in moves:
+            assert flip_position(apply_move(pos, side, m)) == apply_move(flip_position(pos), side.opposite_side(),
+                                                                         flip_move(m))
+
+    res = deduce_min_max_result(board, Side.BLACKES, 3)
+    twin_uncached = deduce_min_max_result(flipped, Side.WHITES, 3)
+    assert res.score == twin_uncached.score
+    complete_uncached = deduce_best_complete_move(flipped, Side.BLACKES, 2)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["CHECKERSANALYSER_RESULT_CACHE"] = os.path.join(tmp, "results.sqlite")
+        try:
+            cache = default_result_cache()
+            res = deduce_min_max_result(board, Side.BLACKES, 3)
+            # One row answers both orientations, in the caller's coordinates and with ties broken in
+            # the caller's generation order, as a search of its own position would.
+            twin = deduce_min_max_result(flipped, Side.WHITES, 3)
+            assert cache.hits == 1 and len(cache) == 1
+            assert twin.score == res.score and twin.move == twin_uncached.move
+            if twin.move == flip_move(res.move):
+                assert twin.pv == tuple(flip_move(m) for m in res.pv)
+            else:
+                assert twin.pv == (twin.move,)
+            deduce_best_complete_move(board, Side.WHITES, 2)
+            twin = deduce_best_complete_move(flipped, Side.BLACKES, 2)
+            assert cache.hits == 2 and twin.to_list() == complete_uncached.to_list()
+            cache.close()
+        finally:
+            del os.environ["CHECKERSANALYSER_RESULT_CACHE"]
+
+        # Ties between equal moves are broken the same way whichever orientation reached the cache first.
+        answers = [(deduce_min_max_result(board, Side.BLACKES, 3).move,
+                    deduce_best_complete_move(board, Side.BLACKES, 3).to_list())]
+        for warm in (False, True):
+            os.environ["CHECKERSANALYSER_RESULT_CACHE"] = os.path.join(tmp, f"warm{warm}.sqlite")
+            try:
+                cache = default_result_cache()
+                if warm:
+                    deduce_min_max_result(flipped, Side.WHITES, 3)
+                    deduce_best_complete_move(flipped, Side.WHITES, 3)
+                answers.append((deduce_min_max_result(board, Side.BLACKES, 3).move,
+                                deduce_best_complete_move(board, Side.BLACKES, 3).to_list()))
+                assert cache.hits == (2 if warm else 0)
+                cache.close()
+            finally:
+                del os.environ["CHECKERSANALYSER_RESULT_CACHE"]
+        print(answers)
+        assert answers[0] == answers[1] == answers[2]
+
+        # Cache off, on and cold, or warmed by the flipped twins: every answer for either side is the same.
+        boards = [board] + [to_board(apply_move(pos, side, m)) for side in Side for m in generate_moves(pos, side)]
+
+        def answers(first=()):
+            for b in first:
+                for side in Side:
+                    deduce_min_max_result(flip_board(b), side.opposite_side(), 3)
+                    deduce_best_complete_move(flip_board(b), side.opposite_side(), 2)
+            return [(deduce_min_max_result(b, side, 3).move, repr(deduce_best_complete_move(b, side, 2)))
+                    for b in boards for side in Side]
+
+        uncached = answers()
+        for warm in ((), boards):
+            os.environ["CHECKERSANALYSER_RESULT_CACHE"] = os.path.join(tmp, f"sample{len(warm)}.sqlite")
+            try:
+                cache = default_result_cache()
+                assert answers(warm) == uncached
+                assert cache.hits == (4 * len(boards) if warm else 0)
+                cache.close()
+            finally:
+                del os.environ["CHECKERSANALYSER_RESULT_CACHE"]
@@ -0,0 +1,63 @@
+from checkersanalyser.bitboard import from_board, to_board, generate_moves, apply_move
+from checkersanalyser.common import Side
+from checkersanalyser.moveanalyser import MoveAnalyser, reconstruct_game
+
+
+def test():
+    board = [
+        [0, 0, 0, 0, 0, 0, 0, 0],  # 0
+        [0, 0, 0, 3, 0, 3, 0, 0],  # 1
+        [0, 0, 1, 0, 0, 0, 0, 0],  # 2
+        [0, 0, 0, 3, 0, 3, 0, 0],  # 3
+        [0, 0, 0, 0, 0, 0, 0, 0],  # 4
+        [0, 3, 0, 0, 0, 0, 0, 0],  # 5
+        [0, 0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0, 0]
+    ]
+
+    # Whites take the four men in a circle, one way round or the other, then blacks and whites move.
+    pos = from_board(board)
+    circle = generate_moves(pos, Side.WHITES)[0]
+    after_circle = apply_move(pos, Side.WHITES, circle)
+    black = generate_moves(after_circle, Side.BLACKES)[0]
+    after_black = apply_move(after_circle, Side.BLACKES, black)
+    white = generate_moves(after_black, Side.WHITES)[-1]
+    after_white = apply_move(after_black, Side.WHITES, white)
+    teleported = to_board(after_white)
+    teleported[2][2], teleported[4][4] = 0, 1
+    frames = [board, to_board(after_circle), to_board(after_black), to_board(after_white), to_board(after_white),
+              teleported]
+    plies = list(reconstruct_game(frames))
+    print(plies)
+    assert [(p.frame, p.side, p.legal) for p in plies] == [
+        (1, Side.WHITES, True), (2, Side.BLACKES, True), (3, Side.WHITES, True), (4, Side.BLACKES, False),
+        (5, None, False)]
+    assert len(plies[0].moves) == 2 and circle in plies[0].moves
+    assert repr(plies[1].moves) == "({(5, 1) -> (6, 0)},)" and plies[2].moves == (white,)
+    assert plies[-1].position == from_board(teleported)
+
+    # The side is read off the first move, and again after a board that no move reaches.
+    frames = [to_board(after_circle), to_board(after_black), teleported, to_board(apply_move(
+        from_board(teleported), Side.BLACKES, generate_moves(from_board(teleported), Side.BLACKES)[0]))]
+    assert [(p.side, p.legal) for p in reconstruct_game(frames)] == [
+        (Side.BLACKES, True), (Side.WHITES, False), (Side.BLACKES, True)]
+    assert [p.side for p in reconstruct_game(frames[:2], Side.WHITES)] == [Side.WHITES]
+    assert list(reconstruct_game([])) == [] and list(reconstruct_game([board])) == []
+
+    # A man crowned on the move may still show as a man: the boards match as MoveAnalyser reads them,
+    # and the game goes on with the king the rules made.
+    before = [[0] * 8 for _ in range(8)]
+    before[1][1], before[5][5] = 1, 3
+    crowned = [[0] * 8 for _ in range(8)]
+    crowned[0][0], crowned[5][5] = 1, 3
+    black_moved = [[0] * 8 for _ in range(8)]
+    black_moved[0][0], black_moved[6][4] = 1, 3
+    back = [[0] * 8 for _ in range(8)]
+    back[3][3], back[6][4] = 1, 3
+    assert repr(MoveAnalyser(before, crowned).calculate_move_for_side(Side.WHITES)) == "[{(1, 1) -> (0, 0)}]"
+    plies = list(reconstruct_game([before, crowned, black_moved, back]))
+    print(plies)
+    assert [(p.side, repr(p.moves)) for p in plies] == [
+        (Side.WHITES, "({(1, 1) -> (0, 0)},)"), (Side.BLACKES, "({(5, 5) -> (6, 4)},)"),
+        (Side.WHITES, "({(0, 0) -> (3, 3)},)")]
+    assert to_board(plies[0].position)[0][0] == 2
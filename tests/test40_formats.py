@@ -0,0 +1,100 @@
+import io
+import json
+import os
+import tempfile
+
+from checkersanalyser import formats
+from checkersanalyser.batch import run_batch
+from checkersanalyser.bitboard import from_board, generate_moves, apply_move
+from checkersanalyser.common import Side
+from checkersanalyser.evaluate import np
+
+
+def test():
+    board = [
+        [3, 0, 3, 0, 3, 0, 3, 0],  # 0
+        [0, 3, 0, 0, 0, 3, 0, 3],  # 1
+        [3, 0, 3, 0, 0, 0, 3, 0],  # 2
+        [0, 0, 0, 3, 0, 4, 0, 0],  # 3
+        [0, 0, 1, 0, 0, 0, 0, 0],  # 4
+        [0, 1, 0, 0, 0, 2, 0, 1],  # 5
+        [1, 0, 1, 0, 1, 0, 1, 0],
+        [0, 1, 0, 1, 0, 1, 0, 1]
+    ]
+
+    fen = formats.to_fen(board, Side.BLACKES)
+    print(fen)
+    assert fen == "B:W19,21,K22,24,25,26,27,28,29,30,31,32:B1,2,3,4,5,6,8,9,11,12,K14,15"
+    assert formats.from_fen(fen) == (board, Side.BLACKES)
+    assert formats.from_fen("w:W21-32:B1-12.")[0] == formats.from_fen(formats.INITIAL_FEN)[0]
+    assert formats.from_fen("W:W:B1")[0][0] == [0, 0, 0, 0, 0, 0, 3, 0]
+    for bad in ("X:W1:B2", "W:W33:B1", "W:W1:B1", "W:W1:Z2"):
+        try:
+            formats.from_fen(bad)
+            assert False, bad
+        except ValueError:
+            pass
+
+    # A short game written out and read back, captures with their landing squares.
+    pos, side, moves = from_board(board), Side.BLACKES, []
+    for _ in range(6):
+        m = generate_moves(pos, side)[-1]
+        moves.append(m)
+        pos, side = apply_move(pos, side, m), side.opposite_side()
+    pdn = formats.to_pdn(board, Side.BLACKES, moves)
+    print(pdn)
+    assert pdn.startswith(f'[FEN "{fen}"]\n\n1. 14-17 21x14 2. 9x18 19x10 3. 6x15') and pdn.endswith(" *\n")
+    assert formats.from_pdn(pdn) == (board, Side.BLACKES, moves)
+
+    # Standard numbering: the openings of both sides, and a published line read and written back.
+    start, side = formats.parse_fen_position(formats.INITIAL_FEN)
+    assert side == Side.BLACKES
+    assert sorted(formats.move_text(m) for m in generate_moves(start, side)) == \
+        ["10-14", "10-15", "11-15", "11-16", "12-16", "9-13", "9-14"]
+    assert sorted(formats.move_text(m) for m in generate_moves(start, Side.WHITES)) == \
+        ["21-17", "22-17", "22-18", "23-18", "23-19", "24-19", "24-20"]
+    old_fourteenth = ('[Event "Old Fourteenth"]\n[GameType "21"]\n'
+                      '1. 11-15 23-19 2. 8-11 22-17 3. 4-8 17-13 4. 15-18 24-20 {trunk} 5. 11-15 28-24 '
+                      '6. 8-11 26-23 7. 9-14 (6-9) 31-26 *')
+    opening = formats.from_pdn(old_fourteenth)
+    assert opening[:2] == formats.from_fen(formats.INITIAL_FEN)
+    text = "11-15 23-19 8-11 22-17 4-8 17-13 15-18 24-20 11-15 28-24 8-11 26-23 9-14 31-26"
+    assert " ".join(formats.move_text(m) for m in opening[2]) == text
+    written = formats.to_pdn(*opening)
+    print(written)
+    assert written.endswith("6. 8-11 26-23 7. 9-14 31-26 *\n") and formats.from_pdn(written) == opening
+    assert formats.to_pdn(start, Side.WHITES, opening[2][1:2]).endswith("\n1... 23-19 *\n")
+    game = formats.from_pdn("1. 9-14 23-18 2. 14x23 27x18")
+    assert [formats.move_text(m) for m in game[2]] == ["9-14", "23-18", "14x23", "27x18"]
+    try:
+        formats.from_pdn("1. 9-14 23-18 2. 10-15")
+        assert False
+    except ValueError as e:
+        assert "illegal move '10-15' for Blacks" in str(e)
+
+    record = formats.pack(board, Side.BLACKES)
+    assert len(record) == formats.RECORD_BYTES == 13
+    assert formats.unpack(record) == (from_board(board), Side.BLACKES)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "positions.bin")
+        positions = [(from_board(board), Side.BLACKES)]
+        pos, side = from_board(board), Side.BLACKES
+        for m in moves:
+            pos, side = apply_move(pos, side, m), side.opposite_side()
+            positions.append((pos, side))
+        assert formats.write_positions(path, [(board, Side.BLACKES)] + positions[1:]) == 7
+        data = formats.PositionFile(path)
+        assert len(data) == 7 and list(data) == positions and data[-1] == positions[-1]
+        assert [p.counts for p, _ in data] == [p.counts for p, _ in positions]
+        if np is not None:
+            bitboards, sides = data.bitboards(1, 4)
+            assert bitboards.tolist() == [list(p.as_tuple()) for p, _ in positions[1:4]]
+            assert sides.tolist() == [0, 1, 0]
+            del bitboards, sides
+        data.close()
+
+    out = io.StringIO()
+    run_batch([json.dumps({"fen": fen, "depth": 2}), json.dumps({"board": board, "side": "b", "depth": 2})], out)
+    from_fen, from_list = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert from_fen["move"] is not None and from_fen["move"] == from_list["move"]
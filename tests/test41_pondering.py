@@ -0,0 +1,54 @@
+import time
+
+from checkersanalyser.bitboard import from_board, to_board, apply_move
+from checkersanalyser.common import Side
+from checkersanalyser.movemaker import deduce_min_max_result
+from checkersanalyser.ponder import Ponderer
+
+
+def test():
+    board = [
+        [3, 0, 3, 0, 3, 0, 3, 0],  # 0
+        [0, 3, 0, 0, 0, 3, 0, 3],  # 1
+        [3, 0, 3, 0, 0, 0, 3, 0],  # 2
+        [0, 0, 0, 3, 0, 3, 0, 0],  # 3
+        [0, 0, 1, 0, 0, 0, 0, 0],  # 4
+        [0, 1, 0, 0, 0, 1, 0, 1],  # 5
+        [1, 0, 1, 0, 1, 0, 1, 0],
+        [0, 1, 0, 1, 0, 1, 0, 1]
+    ]
+
+    ponderer = Ponderer(4)
+    res = ponderer.search(board, Side.WHITES)
+    expected = deduce_min_max_result(board, Side.WHITES, 4)
+    assert (res.move, res.score, res.pv) == (expected.move, expected.score, expected.pv)
+    assert ponderer.thread is not None
+
+    # The opponent plays the predicted reply: the answer is the one the background search found.
+    reply = apply_move(apply_move(from_board(board), Side.WHITES, res.pv[0]), Side.BLACKES, res.pv[1])
+    ponderer.thread.join()
+    pondered = ponderer.pondered
+    res = ponderer.search(to_board(reply), Side.WHITES)
+    expected = deduce_min_max_result(to_board(reply), Side.WHITES, 4)
+    print(res)
+    assert ponderer.hits == 1 and ponderer.misses == 0 and res is pondered
+    assert (res.move, res.score, res.depth) == (expected.move, expected.score, 4)
+
+    # Any other reply stops the background search and starts afresh.
+    other = apply_move(from_board(board), Side.WHITES, expected.pv[0])
+    move = ponderer.best_move(to_board(other), Side.BLACKES)
+    assert ponderer.misses == 1
+    assert move.to_list() == deduce_min_max_result(to_board(other), Side.BLACKES, 4).move.to_list()
+
+    # A deep background search stops promptly, and a budget bounds the wait on a predicted position.
+    deep = Ponderer(30, time_budget_ms=100)
+    res = deep.search(board, Side.WHITES)
+    assert res.depth >= 1 and deep.thread is not None
+    reply = apply_move(apply_move(from_board(board), Side.WHITES, res.pv[0]), Side.BLACKES, res.pv[1])
+    start = time.perf_counter()
+    res = deep.search(to_board(reply), Side.WHITES)
+    assert deep.hits == 1 and res.depth >= 1 and time.perf_counter() - start < 2
+    start = time.perf_counter()
+    deep.stop()
+    ponderer.stop()
+    assert deep.thread is None and ponderer.thread is None and time.perf_counter() - start < 2
@@ -0,0 +1,76 @@
+import threading
+import time
+
+from checkersanalyser.bench import POSITIONS
+from checkersanalyser.bitboard import from_board, to_board, apply_move
+from checkersanalyser.common import Side
+from checkersanalyser.search import Searcher
+from checkersanalyser.session import GameSession
+from checkersanalyser.ttable import TranspositionTable
+
+
+def test():
+    board = [
+        [3, 0, 3, 0, 3, 0, 3, 0],  # 0
+        [0, 3, 0, 0, 0, 3, 0, 3],  # 1
+        [3, 0, 3, 0, 0, 0, 3, 0],  # 2
+        [0, 0, 0, 3, 0, 3, 0, 0],  # 3
+        [0, 0, 1, 0, 0, 0, 0, 0],  # 4
+        [0, 1, 0, 0, 0, 1, 0, 1],  # 5
+        [1, 0, 1, 0, 1, 0, 1, 0],
+        [0, 1, 0, 1, 0, 1, 0, 1]
+    ]
+
+    # Both sides play the session's moves; every answer is the one a search from scratch gives, with
+    # fewer nodes once the table holds the previous searches.
+    session = GameSession(board, Side.BLACKES, 5)
+    cold_nodes = 0
+    for ply in range(8):
+        res = session.search()
+        cold = Searcher(5, TranspositionTable(1 << 16)).search(session.position, session.side)
+        assert (res.move, res.score, res.depth) == (cold.move, cold.score, cold.depth)
+        cold_nodes += cold.nodes
+        assert session.play(res.move) == res.move
+    print(session.nodes, cold_nodes)
+    assert session.nodes < cold_nodes * 0.8 and len(session.history) == 8
+
+    move = session.best_move()
+    session.play(move)
+    assert session.history[-1].to_list() == move.to_list()
+    reply = session.legal_moves()[0]
+    assert session.observe(to_board(apply_move(session.position, session.side, reply))) == reply
+    assert session.side == Side.BLACKES and session.board == to_board(session.position)
+    try:
+        session.play([(0, 0), (7, 7)])
+        assert False
+    except ValueError:
+        pass
+    try:
+        session.observe(board)
+        assert False
+    except ValueError:
+        pass
+
+    opening = GameSession()
+    assert opening.side == Side.WHITES and len(opening.legal_moves()) == 7
+    assert (opening.board, opening.side) == POSITIONS["opening"]
+    opening = GameSession(side=Side.BLACKES)
+    assert opening.side == Side.BLACKES and len(opening.legal_moves()) == 7
+    opening.play([(2, 0), (3, 1)])
+    assert opening.side == Side.WHITES and opening.board[3][1] == 3
+
+    # A resumed search keeps to its budget from the first node, and answers with the table's depth.
+    table = TranspositionTable(1 << 16)
+    done = Searcher(6, table).search(from_board(board), Side.BLACKES)
+    stop = threading.Event()
+    stop.set()
+    res = Searcher(30, table, stop=stop).search(from_board(board), Side.BLACKES, resume=True)
+    assert (res.move, res.score, res.depth) == (done.move, done.score, 6) and res.nodes <= 2
+    start = time.perf_counter()
+    res = Searcher(30, table, time_budget_ms=20).search(from_board(board), Side.BLACKES, resume=True)
+    assert res.depth >= 6 and time.perf_counter() - start < 1
+    # A table deeper than asked for answers with its own depth, stopped or not.
+    done = Searcher(6, table).search(from_board(board), Side.BLACKES)
+    for searcher in (Searcher(4, table, stop=stop), Searcher(4, table, time_budget_ms=0.0001), Searcher(4, table)):
+        res = searcher.search(from_board(board), Side.BLACKES, resume=True)
+        assert (res.move, res.score, res.depth, res.pv) == (done.move, done.score, 6, done.pv) and res.nodes == 0
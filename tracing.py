@@ -0,0 +1,23 @@
+import logging
+from typing import Callable, Optional
+
+Tracer = Callable[[dict], None]
+
+# Off by default: traced code checks for None before building any event.
+tracer: Optional[Tracer] = None
+
+
+def set_tracer(t: Optional[Tracer]) -> Optional[Tracer]:
+    global tracer
+    previous, tracer = tracer, t
+    return previous
+
+
+def logging_tracer(logger: logging.Logger = None, level: int = logging.DEBUG) -> Tracer:
+    logger = logging.getLogger("checkersanalyser") if logger is None else logger
+
+    def log_event(event: dict):
+        if logger.isEnabledFor(level):
+            logger.log(level, "%s", event, extra={"trace": event})
+
+    return log_event
@@ -0,0 +1,88 @@
+from array import array
+from typing import NamedTuple, Optional
+
+EXACT, LOWER, UPPER = 1, 2, 3
+NO_MOVE = 0x3FF
+# Depths are packed into eight bits.
+MAX_DEPTH = 0xFF
+
+DEFAULT_TABLE_BYTES = 16 * 1024 * 1024
+
+# Each entry is two unsigned 64-bit words: the full key and the packed data below.
+_ENTRY_BYTES = 16
+_SCORE_OFFSET = 1 << 15
+
+
+class TableEntry(NamedTuple):
+    depth: int
+    bound: int
+    score: int
+    move: Optional[int]
+
+
+def _pack(depth: int, bound: int, score: int, move: Optional[int], generation: int) -> int:
+    move = NO_MOVE if move is None else move
+    return (score + _SCORE_OFFSET) | depth << 16 | bound << 24 | move << 26 | generation << 36
+
+
+# Depth-preferred replacement: within one search a slot only takes a result of at least the same
+# depth, unless it is for the same position. Entries left by earlier searches are always replaced.
+class TranspositionTable:
+
+    def __init__(self, max_bytes: int = DEFAULT_TABLE_BYTES):
+        size = 1
+        while size * 2 * _ENTRY_BYTES <= max_bytes:
+            size *= 2
+        self.mask = size - 1
+        self.keys = array('Q', bytes(8 * size))
+        self.data = array('Q', bytes(8 * size))
+        self.generation = 1
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return self.mask + 1
+
+    def new_search(self):
+        self.generation = self.generation % 0xFFFF + 1
+
+    def clear(self):
+        size = len(self)
+        self.keys = array('Q', bytes(8 * size))
+        self.data = array('Q', bytes(8 * size))
+        self.hits = self.misses = 0
+
+    def probe(self, key: int) -> Optional[TableEntry]:
+        i = key & self.mask
+        data = self.data[i]
+        if data == 0 or self.keys[i] != key:
+            self.misses += 1
+            return None
+        self.hits += 1
+        move = data >> 26 & NO_MOVE
+        return TableEntry(data >> 16 & 0xFF, data >> 24 & 3, (data & 0xFFFF) - _SCORE_OFFSET,
+                          None if move == NO_MOVE else move)
+
+    def store(self, key: int, depth: int, bound: int, score: int, move: Optional[int]):
+        i = key & self.mask
+        old = self.data[i]
+        if old != 0 and self.keys[i] != key and old >> 36 == self.generation and old >> 16 & 0xFF > depth:
+            return
+        self.keys[i] = key
+        self.data[i] = _pack(depth, bound, score, move, self.generation)
+
+
+_default_table: Optional[TranspositionTable] = None
+
+
+def default_table() -> TranspositionTable:
+    global _default_table
+    if _default_table is None:
+        _default_table = TranspositionTable()
+    return _default_table
+
+
+def set_default_table_size(max_bytes: int) -> TranspositionTable:
+    global _default_table
+    _default_table = TranspositionTable(max_bytes)
+    return _default_table
@@ -0,0 +1,18 @@
+import random
+
+# Fixed seed: keys must be the same in every process so hashes can be shared between workers.
+_rng = random.Random(0x0C4EC4E5)
+
+# One table per bitboard of a Position: white men, white kings, black men, black kings.
+PIECE_KEYS = tuple(tuple(_rng.getrandbits(64) for _ in range(32)) for _ in range(4))
+BLACKS_TO_MOVE = _rng.getrandbits(64)
+
+
+def hash_bitboards(bitboards: tuple[int, int, int, int]) -> int:
+    key = 0
+    for keys, bb in zip(PIECE_KEYS, bitboards):
+        while bb:
+            low = bb & -bb
+            key ^= keys[low.bit_length() - 1]
+            bb ^= low
+    return key